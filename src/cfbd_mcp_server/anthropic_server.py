@@ -3,7 +3,10 @@ from fastapi.responses import JSONResponse, RedirectResponse, PlainTextResponse
 from starlette.responses import Response, StreamingResponse
 from pydantic import BaseModel
 from typing import List, Optional, Any, Dict
-from cfbd_mcp_server.server import handle_call_tool, handle_list_tools
+from cfbd_mcp_server.server import (
+    handle_call_tool, handle_list_tools, handle_list_resources, handle_read_resource, open_api_client,
+    close_api_client, tool_catalogue, catalogue_version, REDIS_URL, STATS_PROVIDERS
+)
 import uuid
 import logging
 import os
@@ -20,8 +23,9 @@ from collections.abc import AsyncIterator
 import contextlib
 from mcp.server.lowlevel import Server
 from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
-from mcp.types import Tool, TextContent
-from .event_store import InMemoryEventStore
+from mcp.types import Resource, Tool, TextContent
+from .event_store import InMemoryEventStore, RedisEventStore
+from .token_store import AuthCodeStore, FileTokenStore, RedisAuthCodeStore, RedisTokenStore, TokenStore
 import time
 
 # Load environment variables
@@ -118,30 +122,38 @@ ANTHROPIC_BEARER_TOKEN = os.getenv("ANTHROPIC_BEARER_TOKEN")
 if not ANTHROPIC_BEARER_TOKEN:
     raise RuntimeError("ANTHROPIC_BEARER_TOKEN environment variable must be set")
 
-# In-memory structures and file persistence for tokens
-AUTH_CODES = {}
+# In-memory structures for sessions
 SESSION_TOKENS = {}
-ISSUED_TOKENS_FILE = os.getenv("ISSUED_TOKENS_FILE", "./issued_tokens.json")
 
-def load_issued_tokens():
-    """Load issued tokens from disk."""
-    if os.path.exists(ISSUED_TOKENS_FILE):
-        try:
-            with open(ISSUED_TOKENS_FILE, "r") as f:
-                return set(json.load(f))
-        except Exception as e:
-            logger.error(f"Failed to load issued tokens: {e}")
-    return set()
+# Pending authorization codes: "memory" or "redis" (when /authorize and /token may hit different workers)
+AUTH_CODE_STORE = os.getenv("AUTH_CODE_STORE", "memory").lower()
+AUTH_CODE_TTL = int(os.getenv("AUTH_CODE_TTL", "600"))
+AUTH_CODE_MAX = int(os.getenv("AUTH_CODE_MAX", "10000"))
 
-def save_issued_tokens(tokens):
-    """Save issued tokens to disk with error handling."""
-    try:
-        with open(ISSUED_TOKENS_FILE, "w") as f:
-            json.dump(list(tokens), f)
-    except Exception as e:
-        logger.error(f"Failed to save issued tokens: {e}")
+def create_auth_code_store() -> AuthCodeStore:
+    if AUTH_CODE_STORE == "redis":
+        logger.info(f"Using Redis authorization code store (ttl {AUTH_CODE_TTL}s)")
+        return RedisAuthCodeStore(REDIS_URL, ttl=AUTH_CODE_TTL)
+    if AUTH_CODE_STORE != "memory":
+        logger.warning(f"Unknown AUTH_CODE_STORE {AUTH_CODE_STORE!r} — using in-memory codes")
+    return AuthCodeStore(ttl=AUTH_CODE_TTL, max_codes=AUTH_CODE_MAX)
+
+auth_codes = create_auth_code_store()
+
+# Issued access tokens: "file" (append-only log, default) or "redis" (shared by all workers)
+TOKEN_STORE = os.getenv("TOKEN_STORE", "file").lower()
+ISSUED_TOKENS_FILE = os.getenv("ISSUED_TOKENS_FILE", "./issued_tokens.json")
+ISSUED_TOKENS_TTL = int(os.getenv("ISSUED_TOKENS_TTL", str(30 * 86400)))
+
+def create_token_store() -> TokenStore:
+    if TOKEN_STORE == "redis":
+        logger.info(f"Using Redis token store (ttl {ISSUED_TOKENS_TTL}s)")
+        return RedisTokenStore(REDIS_URL, ttl=ISSUED_TOKENS_TTL)
+    if TOKEN_STORE != "file":
+        logger.warning(f"Unknown TOKEN_STORE {TOKEN_STORE!r} — using the token file")
+    return FileTokenStore(ISSUED_TOKENS_FILE, ttl=ISSUED_TOKENS_TTL)
 
-ISSUED_TOKENS = load_issued_tokens()
+token_store = create_token_store()
 
 def verify_pkce(code_verifier: str, code_challenge: str) -> bool:
     """Verify PKCE challenge."""
@@ -149,18 +161,56 @@ def verify_pkce(code_verifier: str, code_challenge: str) -> bool:
     computed_challenge = base64.urlsafe_b64encode(hashed).decode().rstrip("=")
     return computed_challenge == code_challenge
 
+# Event store for Last-Event-ID resumability: "memory" (single worker) or
+# "redis" (Redis Streams, required when running several workers)
+EVENT_STORE = os.getenv("EVENT_STORE", "memory").lower()
+EVENT_STORE_MAX_EVENTS = int(os.getenv("EVENT_STORE_MAX_EVENTS", "100"))
+EVENT_STORE_TTL = int(os.getenv("EVENT_STORE_TTL", "3600"))
+# Budgets across all streams of the in-memory store; least recently used streams go first
+EVENT_STORE_MAX_TOTAL_EVENTS = int(os.getenv("EVENT_STORE_MAX_TOTAL_EVENTS", "10000"))
+EVENT_STORE_MAX_BYTES = int(os.getenv("EVENT_STORE_MAX_BYTES", str(64 * 1024 * 1024)))
+# Stored messages are serialized; large ones are also compressed (none, gzip or zstd)
+EVENT_STORE_COMPRESSION = os.getenv("EVENT_STORE_COMPRESSION", "gzip")
+EVENT_STORE_COMPRESS_MIN_BYTES = int(os.getenv("EVENT_STORE_COMPRESS_MIN_BYTES", "65536"))
+
+def create_event_store():
+    if EVENT_STORE == "redis":
+        logger.info(f"Using Redis event store (max {EVENT_STORE_MAX_EVENTS} events/stream, ttl {EVENT_STORE_TTL}s)")
+        return RedisEventStore(REDIS_URL, max_events_per_stream=EVENT_STORE_MAX_EVENTS, ttl=EVENT_STORE_TTL)
+    if EVENT_STORE != "memory":
+        logger.warning(f"Unknown EVENT_STORE {EVENT_STORE!r} — using in-memory event store")
+    return InMemoryEventStore(
+        max_events_per_stream=EVENT_STORE_MAX_EVENTS,
+        max_total_events=EVENT_STORE_MAX_TOTAL_EVENTS,
+        max_total_bytes=EVENT_STORE_MAX_BYTES,
+        codec=EVENT_STORE_COMPRESSION,
+        compress_min_bytes=EVENT_STORE_COMPRESS_MIN_BYTES,
+    )
+
 # MCP server setup
-event_store = InMemoryEventStore()
+event_store = create_event_store()
+STATS_PROVIDERS["event_store"] = event_store.stats
+STATS_PROVIDERS["token_store"] = token_store.stats
+STATS_PROVIDERS["auth_codes"] = auth_codes.stats
 server = Server("cfbd-anthropic-server")
 session_manager = StreamableHTTPSessionManager(app=server, event_store=event_store, json_response=False)
 
 @contextlib.asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncIterator[None]:
-    """Manage lifecycle of the session manager."""
-    async with session_manager.run():
-        logger.info("Streamable session manager started")
-        yield
-        logger.info("Streamable session manager shutting down")
+    """Manage lifecycle of the session manager and the shared CFBD client."""
+    await open_api_client()
+    await token_store.load()
+    try:
+        async with session_manager.run():
+            logger.info("Streamable session manager started")
+            yield
+            logger.info("Streamable session manager shutting down")
+    finally:
+        await close_api_client()
+        await token_store.close()
+        await auth_codes.close()
+        if isinstance(event_store, RedisEventStore):
+            await event_store.close()
 
 # Main FastAPI app
 app = FastAPI(lifespan=lifespan)
@@ -251,18 +301,23 @@ async def oauth_metadata(request: Request):
 async def oauth_authorize(response_type: str = Query(...), client_id: str = Query(...), redirect_uri: str = Query(...), scope: str = Query(...), state: str = Query(...), code_challenge: str = Query(...), code_challenge_method: str = Query(...)):
     """Handle OAuth authorization request."""
     code = uuid.uuid4().hex
-    AUTH_CODES[code] = {
-        "client_id": client_id,
-        "redirect_uri": redirect_uri,
-        "code_challenge": code_challenge
-    }
+    try:
+        await auth_codes.put(code, {
+            "client_id": client_id,
+            "redirect_uri": redirect_uri,
+            "code_challenge": code_challenge
+        })
+    except Exception as e:
+        logger.error(f"Failed to store authorization code: {e}")
+        raise HTTPException(status_code=503, detail="Authorization code store unavailable")
     params = urlencode({"code": code, "state": state})
     return RedirectResponse(url=f"{redirect_uri}?{params}", status_code=302)
 
 @app.post("/token")
 async def oauth_token(grant_type: str = Form(...), code: str = Form(...), redirect_uri: str = Form(...), client_id: str = Form(...), code_verifier: str = Form(...)):
     """Exchange authorization code for access token."""
-    entry = AUTH_CODES.get(code)
+    # Single use: the code is gone after this, whether or not the exchange succeeds
+    entry = await auth_codes.take(code)
     if not entry:
         raise HTTPException(status_code=400, detail="Invalid code")
     if entry["client_id"] != client_id or entry["redirect_uri"] != redirect_uri:
@@ -270,32 +325,57 @@ async def oauth_token(grant_type: str = Form(...), code: str = Form(...), redire
     if not verify_pkce(code_verifier, entry["code_challenge"]):
         raise HTTPException(status_code=400, detail="PKCE verification failed")
     token = uuid.uuid4().hex
-    ISSUED_TOKENS.add(token)
-    save_issued_tokens(ISSUED_TOKENS)
+    try:
+        await token_store.add(token)
+    except Exception as e:
+        logger.error(f"Failed to store issued token: {e}")
+        raise HTTPException(status_code=503, detail="Token store unavailable")
     SESSION_TOKENS[token] = {"session": uuid.uuid4().hex}
     return JSONResponse(content={"access_token": token, "token_type": "Bearer"})
 
-async def handle_streamable_http_auth(scope: Scope, receive: Receive, send: Send):
-    """Handle /mcp requests with bearer token verification."""
-    headers = dict(scope.get("headers", []))
-    auth_header = headers.get(b"authorization", b"").decode()
+_tools_body: bytes | None = None
+
+@app.get("/tools")
+async def tools_catalogue(request: Request):
+    """Serve the tool list as JSON with an ETag; unchanged lists get 304 Not Modified."""
+    global _tools_body
+    error = await _check_bearer(request.headers.get("authorization", ""))
+    if error:
+        return Response(error, status_code=401)
+    version = catalogue_version()
+    headers = {"ETag": f'"{version}"', "Cache-Control": "no-cache"}
+    if request.headers.get("if-none-match", "").strip() in (f'"{version}"', f'W/"{version}"'):
+        return Response(status_code=304, headers=headers)
+    if _tools_body is None:
+        tools = [tool.model_dump(mode="json", exclude_none=True) for tool in tool_catalogue()]
+        _tools_body = json.dumps({"version": version, "tools": tools}, separators=(",", ":")).encode("utf-8")
+    return Response(content=_tools_body, media_type="application/json", headers=headers)
+
+async def _check_bearer(auth_header: str) -> str | None:
+    """Verify an Authorization header; return the 401 message, or None if the token was issued."""
     if not auth_header.startswith("Bearer "):
         logger.warning("Unauthorized access attempt: Missing or invalid header")
-        response = Response("Unauthorized: Missing or invalid header", status_code=401)
-        await response(scope, receive, send)
-        return
+        return "Unauthorized: Missing or invalid header"
     token = auth_header.split(" ")[1]
-    if token not in ISSUED_TOKENS:
+    if not await token_store.contains(token):
         logger.warning(f"Unauthorized access attempt with token: {token[:8]}...")
-        response = Response("Unauthorized: Token not recognized", status_code=401)
-        await response(scope, receive, send)
-        return
+        return "Unauthorized: Token not recognized"
 
     # Keep auth log; avoid printing full token unless verbose
     if DEBUG_LEVEL >= 2:
         logger.debug(f"Authorized request with token: {token}")
     else:
         logger.info(f"Authorized request with token: {token[:8]}...")
+    return None
+
+async def handle_streamable_http_auth(scope: Scope, receive: Receive, send: Send):
+    """Handle /mcp requests with bearer token verification."""
+    headers = dict(scope.get("headers", []))
+    error = await _check_bearer(headers.get(b"authorization", b"").decode())
+    if error:
+        response = Response(error, status_code=401)
+        await response(scope, receive, send)
+        return
     await session_manager.handle_request(scope, receive, send)
 
 def root_handler(request: Request):
@@ -328,5 +408,15 @@ async def list_tools() -> List[Tool]:
     """List available tools."""
     return await handle_list_tools()
 
+@server.list_resources()
+async def list_resources() -> List[Resource]:
+    """List the endpoint schemas and stats://upstream."""
+    return await handle_list_resources()
+
+@server.read_resource()
+async def read_resource(uri) -> str:
+    """Read a resource; stats://upstream includes this server's event, token and auth-code stores."""
+    return await handle_read_resource(uri)
+
 combined_app = app
 
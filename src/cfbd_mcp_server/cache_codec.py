@@ -0,0 +1,112 @@
+"""
+Encoding of cached CFBD bodies stored in Redis.
+
+Compressed values are bytes with a one-line header recording the codec and
+the soft expiry used for stale-while-revalidate:
+
+    ~c1:<codec>:<soft expiry epoch or empty>\\n<compressed body>
+
+where codec is "gzip" or "zstd". Bodies that are not compressed (codec off or
+under the size threshold) keep the earlier layouts, "~swr:<epoch>\\n<json>"
+or bare JSON, which are also what older versions wrote.
+
+Cached error responses (negative entries) are stored as
+
+    ~neg:<HTTP status>:<expiry epoch>\\n<error body>
+"""
+
+import gzip
+import logging
+
+logger = logging.getLogger(__name__)
+
+try:
+    import zstandard
+except ImportError:  # optional dependency
+    zstandard = None
+
+HEADER_PREFIX = b"~c1:"
+LEGACY_SWR_PREFIX = b"~swr:"
+NEGATIVE_PREFIX = b"~neg:"
+CODECS = ("raw", "gzip", "zstd")
+
+_zstd_compressor = zstandard.ZstdCompressor(level=3) if zstandard else None
+_zstd_decompressor = zstandard.ZstdDecompressor() if zstandard else None
+
+
+def resolve_codec(codec: str) -> str:
+    """Return the usable codec for a configured name ("none" → "raw")."""
+    codec = (codec or "raw").lower()
+    if codec in ("none", "off", ""):
+        return "raw"
+    if codec == "zstd" and zstandard is None:
+        logger.warning("zstd cache compression requested but 'zstandard' is not installed — using gzip")
+        return "gzip"
+    if codec not in CODECS:
+        logger.warning(f"Unknown cache codec {codec!r} — storing uncompressed")
+        return "raw"
+    return codec
+
+
+def compress(codec: str, data: bytes) -> bytes:
+    """Compress bytes with a codec returned by resolve_codec ("raw" is a no-op)."""
+    if codec == "gzip":
+        return gzip.compress(data, compresslevel=5)
+    if codec == "zstd":
+        return _zstd_compressor.compress(data)
+    return data
+
+
+def decompress(codec: str, data: bytes) -> bytes:
+    """Inverse of compress."""
+    if codec == "gzip":
+        return gzip.decompress(data)
+    if codec == "zstd":
+        if _zstd_decompressor is None:
+            raise ValueError("zstd-compressed cache entry but 'zstandard' is not installed")
+        return _zstd_decompressor.decompress(data)
+    return data
+
+
+def encode_body(text: str, soft_expiry: float | None, codec: str = "raw", threshold: int = 0) -> bytes:
+    """Build the Redis value for a body, compressing it if it is at least `threshold` bytes."""
+    data = text.encode("utf-8")
+    if codec == "raw" or len(data) < threshold:
+        # Uncompressed bodies keep the older layouts so earlier versions can read them
+        if soft_expiry is None:
+            return data
+        return LEGACY_SWR_PREFIX + f"{soft_expiry:.0f}\n".encode("ascii") + data
+    soft = f"{soft_expiry:.0f}" if soft_expiry is not None else ""
+    return HEADER_PREFIX + f"{codec}:{soft}\n".encode("ascii") + compress(codec, data)
+
+
+def encode_negative(status: int, text: str, expiry: float) -> bytes:
+    """Build the Redis value for a cached error response."""
+    return NEGATIVE_PREFIX + f"{status}:{expiry:.0f}\n".encode("ascii") + text.encode("utf-8")
+
+
+def decode_entry(value: bytes) -> tuple[str, float | None, int | None]:
+    """Return (text, soft expiry, error status or None) for any cached URL value."""
+    if value.startswith(NEGATIVE_PREFIX):
+        header, _, data = value.partition(b"\n")
+        status, _, expiry = header[len(NEGATIVE_PREFIX):].decode("ascii").partition(":")
+        return data.decode("utf-8"), (float(expiry) if expiry else None), int(status)
+    text, soft_expiry = decode_body(value)
+    return text, soft_expiry, None
+
+
+def decode_body(value: bytes) -> tuple[str, float | None]:
+    """Return (body text, soft expiry) for a Redis value in any supported format."""
+    if value.startswith(HEADER_PREFIX):
+        header, _, data = value.partition(b"\n")
+        codec, _, soft = header[len(HEADER_PREFIX):].decode("ascii").partition(":")
+        text = decompress(codec, data).decode("utf-8")
+        return text, (float(soft) if soft else None)
+    if value.startswith(LEGACY_SWR_PREFIX):
+        header, _, data = value.partition(b"\n")
+        try:
+            soft_expiry = float(header[len(LEGACY_SWR_PREFIX):])
+        except ValueError:
+            soft_expiry = None
+        return data.decode("utf-8"), soft_expiry
+    return value.decode("utf-8"), None
@@ -0,0 +1,104 @@
+"""
+Canonical form of tool parameters before a CFBD URL (and its cache key) is built.
+
+Semantically identical queries phrased differently by the model, for example
+{"team": "alabama", "week": None, "year": 2024} and
+{"year": 2024, "team": "Alabama"}, should hit the same URL and cache entry.
+
+Replay a log to measure the effect on cache keys:
+
+    python -m cfbd_mcp_server.canonical calls.log
+
+The log may be JSON lines ({"name": ..., "arguments": {...}}) or the server's
+DEBUG_LEVEL=2 output ("→ GET /games params={...}").
+"""
+
+import ast
+import json
+import re
+import sys
+from urllib.parse import urlencode
+
+# CFBD matches these case-insensitively, so their case only splits the cache
+CASE_INSENSITIVE_PARAMS = {
+    "team", "home", "away", "offense", "defense",
+    "conference", "offense_conference", "defense_conference",
+    "season_type", "seasonType", "classification", "category", "provider",
+    "firstName", "lastName",
+}
+
+
+def _normalize_value(key: str, value):
+    if isinstance(value, str):
+        value = " ".join(value.split())
+        if key in CASE_INSENSITIVE_PARAMS:
+            value = value.lower()
+    return value
+
+
+def canonicalize_params(params: dict) -> dict:
+    """Drop nulls/empty strings, normalize case-insensitive values and sort by key."""
+    canonical = {}
+    for key in sorted(params):
+        value = _normalize_value(key, params[key])
+        if value is None or value == "":
+            continue
+        canonical[key] = value
+    return canonical
+
+
+def _query_key(endpoint: str, params: dict) -> str:
+    """URL-ish key as httpx would build it (None becomes an empty value)."""
+    items = [(k, "" if v is None else v) for k, v in params.items()]
+    return f"{endpoint}?{urlencode(items)}"
+
+
+_DEBUG_LINE = re.compile(r"→ GET (\S+) params=(\{.*\})")
+
+
+def _read_calls(path: str):
+    """Yield (endpoint-or-tool, params) pairs from a call log."""
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith("{"):
+                try:
+                    entry = json.loads(line)
+                    yield entry.get("name") or entry.get("tool"), entry.get("arguments") or {}
+                    continue
+                except json.JSONDecodeError:
+                    pass
+            match = _DEBUG_LINE.search(line)
+            if match:
+                try:
+                    yield match.group(1), ast.literal_eval(match.group(2))
+                except (ValueError, SyntaxError):
+                    pass
+
+
+def replay(path: str) -> dict:
+    """Count distinct cache keys with and without canonicalization for a call log."""
+    calls = 0
+    raw_keys: set[str] = set()
+    canonical_keys: set[str] = set()
+    for endpoint, params in _read_calls(path):
+        calls += 1
+        raw_keys.add(_query_key(endpoint, params))
+        canonical_keys.add(_query_key(endpoint, canonicalize_params(params)))
+    return {
+        "calls": calls,
+        "distinct_keys_raw": len(raw_keys),
+        "distinct_keys_canonical": len(canonical_keys),
+        # Upper bound with an unbounded, never-expiring cache
+        "max_hit_rate_raw": round(1 - len(raw_keys) / calls, 3) if calls else 0.0,
+        "max_hit_rate_canonical": round(1 - len(canonical_keys) / calls, 3) if calls else 0.0,
+    }
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("usage: python -m cfbd_mcp_server.canonical <call log>", file=sys.stderr)
+        sys.exit(2)
+    print(json.dumps(replay(sys.argv[1]), indent=2))
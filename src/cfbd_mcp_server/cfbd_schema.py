@@ -1,6 +1,7 @@
 # College Football Data API
 # api.collegefootballdata.com
 
+from datetime import date
 from typing import TypedDict, Optional, List, Literal
 
 # --- Enums as Literals (strict string enums) ---
@@ -502,6 +503,32 @@ class MetricsPregameWpResponse(TypedDict): # /metrics/wp/pregame response
     spread: float  # Using float since spread can be decimal
     homeWinProb: float  # Using float for probability (0-1)
 
+# Constraints between endpoint parameters that the TypedDicts cannot express.
+# Checked before a request is sent, so calls CFBD would reject never use quota.
+#   one_of:       at least one parameter of each group must be given
+#   exclusive:    at most one parameter of each group may be given
+#   at_least_one: some parameter must be given
+#   ranges:       inclusive (min, max) for a parameter
+#   ordered:      (low, high) pairs that must satisfy low <= high when both are given
+PARAM_CONSTRAINTS = {
+    getGamesTeams: {
+        "one_of": [("week", "team", "conference", "game_id")],
+    },
+    getPlaysStats: {
+        "at_least_one": True,
+    },
+    getCoaches: {
+        "at_least_one": True,
+        "ordered": [("minYear", "maxYear")],
+    },
+    getLines: {
+        "one_of": [("year", "gameId")],
+    },
+    getMetricsPregameWp: {
+        "at_least_one": True,
+    },
+}
+
 # Since the API returns a list of win probabilities
 GamesResponseList = List[GamesResponse]
 TeamRecordResponseList = List[TeamRecordResponse]
@@ -516,8 +543,15 @@ LinesList = List[BettingGame]
 MetricsPregameWpResponseList = List[MetricsPregameWpResponse]
 
 
-VALID_SEASONS = range(2001, 2026)
-VALID_WEEKS = range(1, 16)
+FIRST_SEASON = 2001
+
+def valid_seasons() -> range:
+    """Seasons accepted for `year`: through next season, so upcoming schedules can be queried."""
+    return range(FIRST_SEASON, date.today().year + 2)
+
+# Regular seasons run to week 15 or 16 and postseason weeks restart at 1;
+# the upper bound leaves room for longer schedules and playoff rounds
+VALID_WEEKS = range(1, 21)
 VALID_SEASON_TYPES = [
     "regular",
     "postseason",
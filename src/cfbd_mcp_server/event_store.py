@@ -1,15 +1,24 @@
 """
-In-memory event store for demonstrating resumability functionality.
+Event stores for streamable HTTP resumability (Last-Event-ID).
 
-This is a simple implementation intended for examples and testing,
-not for production use where a persistent storage solution would be more appropriate.
+InMemoryEventStore is per-process and intended for examples, testing and
+single-worker deployments. RedisEventStore keeps events in Redis Streams so
+any worker can resume a stream another worker served.
+
+Compare the two:
+
+    python -m cfbd_mcp_server.event_store [redis url]
 """
 
+import asyncio
 import logging
-from collections import deque
-from dataclasses import dataclass
+import sys
+import time
+from collections import OrderedDict, deque
 from uuid import uuid4
 
+import redis.asyncio as redis
+
 from mcp.server.streamable_http import (
     EventCallback,
     EventId,
@@ -19,65 +28,253 @@ from mcp.server.streamable_http import (
 )
 from mcp.types import JSONRPCMessage
 
+from .cache_codec import compress, decompress, resolve_codec
+
 logger = logging.getLogger(__name__)
 
 
-@dataclass
 class EventEntry:
     """
-    Represents an event entry in the event store.
+    Represents an event entry in the event store: the serialized message
+    (None for a priming event) and the codec it is compressed with. The
+    event ID is not stored; it follows from the entry's position.
     """
 
-    event_id: EventId
-    stream_id: StreamId
-    message: JSONRPCMessage
+    __slots__ = ("data", "codec")
+
+    def __init__(self, data: bytes | None, codec: str = "raw"):
+        self.data = data
+        self.codec = codec
+
+    @property
+    def size(self) -> int:
+        return 0 if self.data is None else len(self.data)
+
+    def message(self) -> JSONRPCMessage | None:
+        if self.data is None:
+            return None
+        return JSONRPCMessage.model_validate_json(decompress(self.codec, self.data))
+
+
+class _Stream:
+    """Events of one stream; events[i] has sequence number first_seq + i."""
+
+    __slots__ = ("events", "first_seq", "next_seq", "bytes")
+
+    def __init__(self):
+        self.events: deque[EventEntry] = deque()
+        self.first_seq = 1
+        self.next_seq = 1
+        self.bytes = 0
 
 
 class InMemoryEventStore(EventStore):
     """
-    Simple in-memory implementation of the EventStore interface for resumability.
-    This is primarily intended for examples and testing, not for production use
-    where a persistent storage solution would be more appropriate.
+    In-memory implementation of the EventStore interface for resumability,
+    for single-worker deployments (use RedisEventStore with several workers).
 
-    This implementation keeps only the last N events per stream for memory efficiency.
+    Event IDs are "<epoch>:<seq>@<stream id>": a per-stream sequence number,
+    so a replay indexes straight to the next event, and an epoch that changes
+    on restart so IDs from a previous process are never mistaken for new ones.
+
+    Messages are kept serialized, and compressed with `codec` ("gzip" or
+    "zstd", as for the Redis cache) from `compress_min_bytes` up, so a stored
+    tool result costs its bytes rather than a live object tree; they are
+    parsed again only on replay.
+
+    Each stream keeps its last `max_events_per_stream` events. Across all
+    streams the store holds at most `max_total_events` events and
+    `max_total_bytes` of stored messages; past either budget the least
+    recently used streams are dropped whole.
     """
 
-    def __init__(self, max_events_per_stream: int = 100):
+    def __init__(self, max_events_per_stream: int = 100, max_total_events: int = 10000,
+                 max_total_bytes: int = 64 * 1024 * 1024, codec: str = "gzip",
+                 compress_min_bytes: int = 65536):
         """Initialize the event store.
 
         Args:
             max_events_per_stream: Maximum number of events to keep per stream
+            max_total_events: Maximum number of events across all streams
+            max_total_bytes: Maximum stored message bytes across all streams
+            codec: Compression for large messages: "none", "gzip" or "zstd"
+            compress_min_bytes: Serialized size from which messages are compressed
         """
         self.max_events_per_stream = max_events_per_stream
-        # for maintaining last N events per stream
-        self.streams: dict[StreamId, deque[EventEntry]] = {}
-        # event_id -> EventEntry for quick lookup
-        self.event_index: dict[EventId, EventEntry] = {}
+        self.max_total_events = max_total_events
+        self.max_total_bytes = max_total_bytes
+        self.codec = resolve_codec(codec)
+        self.compress_min_bytes = compress_min_bytes
+        self.epoch = uuid4().hex[:8]
+        # least recently used first
+        self.streams: OrderedDict[StreamId, _Stream] = OrderedDict()
+        self.total_events = 0
+        self.total_bytes = 0
+        self.counters = {"evicted_streams": 0, "evicted_events": 0, "replays": 0, "replay_misses": 0,
+                         "compressed_events": 0, "bytes_saved": 0}
+
+    def _event_id(self, stream_id: StreamId, seq: int) -> EventId:
+        return f"{self.epoch}:{seq}@{stream_id}"
+
+    def _parse(self, event_id: EventId) -> tuple[StreamId, int] | None:
+        prefix, sep, stream_id = event_id.partition("@")
+        epoch, _, seq = prefix.partition(":")
+        if not sep or epoch != self.epoch or not seq.isdigit():
+            return None
+        return stream_id, int(seq)
+
+    def _encode(self, message: JSONRPCMessage | None) -> EventEntry:
+        if message is None:
+            return EventEntry(None)
+        data = message.model_dump_json(by_alias=True, exclude_none=True).encode("utf-8")
+        if self.codec == "raw" or len(data) < self.compress_min_bytes:
+            return EventEntry(data)
+        compressed = compress(self.codec, data)
+        self.counters["compressed_events"] += 1
+        self.counters["bytes_saved"] += len(data) - len(compressed)
+        return EventEntry(compressed, self.codec)
+
+    def _pop_oldest(self, stream: _Stream) -> None:
+        entry = stream.events.popleft()
+        stream.first_seq += 1
+        stream.bytes -= entry.size
+        self.total_events -= 1
+        self.total_bytes -= entry.size
+
+    def _evict(self, keep: StreamId) -> None:
+        """Drop least recently used streams (then the oldest events of `keep`) until within budget."""
+        while self.total_events > self.max_total_events or self.total_bytes > self.max_total_bytes:
+            stream_id = next(iter(self.streams))
+            if stream_id == keep:  # `keep` is most recent, so it is the only stream left
+                stream = self.streams[keep]
+                if len(stream.events) <= 1:
+                    return
+                self._pop_oldest(stream)
+                self.counters["evicted_events"] += 1
+                continue
+            stream = self.streams.pop(stream_id)
+            self.total_events -= len(stream.events)
+            self.total_bytes -= stream.bytes
+            self.counters["evicted_streams"] += 1
+            self.counters["evicted_events"] += len(stream.events)
 
     async def store_event(
-        self, stream_id: StreamId, message: JSONRPCMessage
+        self, stream_id: StreamId, message: JSONRPCMessage | None
     ) -> EventId:
         """Stores an event with a generated event ID."""
-        event_id = str(uuid4())
-        event_entry = EventEntry(
-            event_id=event_id, stream_id=stream_id, message=message
-        )
+        stream = self.streams.get(stream_id)
+        if stream is None:
+            stream = self.streams[stream_id] = _Stream()
+        else:
+            self.streams.move_to_end(stream_id)
+
+        seq = stream.next_seq
+        stream.next_seq += 1
+        entry = self._encode(message)
+        size = entry.size
+        stream.events.append(entry)
+        stream.bytes += size
+        self.total_events += 1
+        self.total_bytes += size
+
+        if len(stream.events) > self.max_events_per_stream:
+            self._pop_oldest(stream)
+        self._evict(keep=stream_id)
+        return self._event_id(stream_id, seq)
+
+    async def replay_events_after(
+        self,
+        last_event_id: EventId,
+        send_callback: EventCallback,
+    ) -> StreamId | None:
+        """Replays events that occurred after the specified event ID."""
+        self.counters["replays"] += 1
+        parsed = self._parse(last_event_id)
+        stream = self.streams.get(parsed[0]) if parsed else None
+        if stream is None or not stream.first_seq <= parsed[1] < stream.next_seq:
+            self.counters["replay_misses"] += 1
+            logger.warning(f"Event ID {last_event_id} not found in store")
+            return None
+
+        stream_id, seq = parsed
+        self.streams.move_to_end(stream_id)
+        # Index of the first event after last_event_id; events is chronological.
+        # Taken up front: the stream may be appended to or trimmed while sending.
+        start = seq - stream.first_seq + 1
+        pending = [stream.events[index] for index in range(start, len(stream.events))]
+        for next_seq, entry in enumerate(pending, seq + 1):
+            message = entry.message()
+            if message is not None:  # priming event, nothing to resend
+                await send_callback(EventMessage(message, self._event_id(stream_id, next_seq)))
+        return stream_id
 
-        # Get or create deque for this stream
-        if stream_id not in self.streams:
-            self.streams[stream_id] = deque(maxlen=self.max_events_per_stream)
+    def stats(self) -> dict:
+        """Memory in use and eviction counters."""
+        return {
+            "streams": len(self.streams),
+            "events": self.total_events,
+            "bytes": self.total_bytes,
+            "max_events": self.max_total_events,
+            "max_bytes": self.max_total_bytes,
+            **self.counters,
+        }
 
-        # If deque is full, the oldest event will be automatically removed
-        # We need to remove it from the event_index as well
-        if len(self.streams[stream_id]) == self.max_events_per_stream:
-            oldest_event = self.streams[stream_id][0]
-            self.event_index.pop(oldest_event.event_id, None)
 
-        # Add new event
-        self.streams[stream_id].append(event_entry)
-        self.event_index[event_id] = event_entry
+class RedisEventStore(EventStore):
+    """
+    EventStore on Redis Streams, shared by every worker using the same Redis.
+
+    Each MCP stream is one Redis stream capped at about `max_events_per_stream`
+    entries (XADD MAXLEN ~). Event IDs are "<entry id>@<stream id>" so a resume
+    knows which stream to read. A stream expires `ttl` seconds after its last
+    event, so idle sessions clean themselves up.
+    """
+
+    REPLAY_BATCH = 100
+
+    def __init__(self, url: str, max_events_per_stream: int = 100, ttl: int = 3600,
+                 key_prefix: str = "cfbd:mcp:events:"):
+        """Initialize the event store.
+
+        Args:
+            url: Redis URL
+            max_events_per_stream: Approximate number of events kept per stream
+            ttl: Seconds an idle stream is kept
+            key_prefix: Prefix of the Redis stream keys
+        """
+        self.url = url
+        self.max_events_per_stream = max_events_per_stream
+        self.ttl = ttl
+        self.key_prefix = key_prefix
+        self._redis: redis.Redis | None = None
+        self.counters = {"stored": 0, "store_errors": 0, "replays": 0, "replay_misses": 0}
+
+    def _client(self) -> redis.Redis:
+        if self._redis is None:
+            self._redis = redis.from_url(self.url, decode_responses=False)
+        return self._redis
 
-        return event_id
+    def _key(self, stream_id: StreamId) -> str:
+        return f"{self.key_prefix}{stream_id}"
+
+    async def store_event(
+        self, stream_id: StreamId, message: JSONRPCMessage | None
+    ) -> EventId:
+        """Appends an event to the stream and returns its ID."""
+        data = b"" if message is None else message.model_dump_json(by_alias=True, exclude_none=True).encode("utf-8")
+        key = self._key(stream_id)
+        try:
+            async with self._client().pipeline(transaction=False) as pipe:
+                pipe.xadd(key, {"m": data}, maxlen=self.max_events_per_stream, approximate=True)
+                pipe.expire(key, self.ttl)
+                entry_id, _ = await pipe.execute()
+        except Exception as e:
+            # The live stream still works; only resuming past this event is lost
+            logger.error(f"Failed to store event for stream {stream_id}: {e}")
+            self.counters["store_errors"] += 1
+            return f"{uuid4().hex}@{stream_id}"
+        self.counters["stored"] += 1
+        return f"{entry_id.decode()}@{stream_id}"
 
     async def replay_events_after(
         self,
@@ -85,22 +282,96 @@ class InMemoryEventStore(EventStore):
         send_callback: EventCallback,
     ) -> StreamId | None:
         """Replays events that occurred after the specified event ID."""
-        if last_event_id not in self.event_index:
+        self.counters["replays"] += 1
+        entry_id, sep, stream_id = last_event_id.partition("@")
+        if not sep:
+            self.counters["replay_misses"] += 1
             logger.warning(f"Event ID {last_event_id} not found in store")
             return None
+        key = self._key(stream_id)
+        r = self._client()
+        try:
+            if not await r.xrange(key, min=entry_id, max=entry_id):
+                self.counters["replay_misses"] += 1
+                logger.warning(f"Event ID {last_event_id} not found in store")
+                return None
+            last = entry_id
+            while True:
+                entries = await r.xrange(key, min=f"({last}", max="+", count=self.REPLAY_BATCH)
+                for raw_id, fields in entries:
+                    data = fields.get(b"m", b"")
+                    if data:  # empty = priming event, nothing to resend
+                        message = JSONRPCMessage.model_validate_json(data)
+                        await send_callback(EventMessage(message, f"{raw_id.decode()}@{stream_id}"))
+                if len(entries) < self.REPLAY_BATCH:
+                    break
+                last = entries[-1][0].decode()
+        except redis.RedisError as e:
+            logger.error(f"Failed to replay events after {last_event_id}: {e}")
+            return None
+        return stream_id
 
-        # Get the stream and find events after the last one
-        last_event = self.event_index[last_event_id]
-        stream_id = last_event.stream_id
-        stream_events = self.streams.get(last_event.stream_id, deque())
+    def stats(self) -> dict:
+        """Counters of this worker; stored events live in Redis."""
+        return dict(self.counters)
 
-        # Events in deque are already in chronological order
-        found_last = False
-        for event in stream_events:
-            if found_last:
-                await send_callback(EventMessage(event.message, event.event_id))
-            elif event.event_id == last_event_id:
-                found_last = True
+    async def close(self) -> None:
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
 
-        return stream_id
 
+async def benchmark(store: EventStore, streams: int = 50, events: int = 100, message_bytes: int = 200) -> dict:
+    """Time store_event and a full replay per stream for an event store."""
+    import json
+    from mcp.types import JSONRPCNotification
+
+    # Repetitive like a tool result, so compression has something to work with
+    record = json.dumps({"offense": "Alabama", "defense": "Georgia", "down": 3, "distance": 7})
+    message = JSONRPCMessage(JSONRPCNotification(
+        jsonrpc="2.0", method="notifications/progress",
+        params={"progressToken": "bench", "progress": 1, "total": 100,
+                "message": (record * (message_bytes // len(record) + 1))[:message_bytes]},
+    ))
+    first_ids = []
+    start = time.perf_counter()
+    for s in range(streams):
+        stream_id = f"bench-{uuid4().hex}-{s}"
+        first_ids.append(await store.store_event(stream_id, message))
+        for _ in range(events - 1):
+            await store.store_event(stream_id, message)
+    store_s = time.perf_counter() - start
+
+    replayed = 0
+
+    async def count(_event: EventMessage) -> None:
+        nonlocal replayed
+        replayed += 1
+
+    start = time.perf_counter()
+    for event_id in first_ids:
+        await store.replay_events_after(event_id, count)
+    replay_s = time.perf_counter() - start
+    return {
+        "store": type(store).__name__,
+        "store_us_per_event": round(store_s / (streams * events) * 1e6, 2),
+        "replay_ms_per_stream": round(replay_s / streams * 1000, 3),
+        "replayed_events": replayed,
+        **({"stored_bytes": store.stats()["bytes"]} if isinstance(store, InMemoryEventStore) else {}),
+    }
+
+
+if __name__ == "__main__":
+    import json
+
+    async def _main() -> None:
+        print(json.dumps(await benchmark(InMemoryEventStore()), indent=2))
+        print(json.dumps(await benchmark(InMemoryEventStore(), streams=10, events=20, message_bytes=256 * 1024), indent=2))
+        if len(sys.argv) > 1:
+            store = RedisEventStore(sys.argv[1], ttl=60, key_prefix="cfbd:mcp:bench:")
+            try:
+                print(json.dumps(await benchmark(store), indent=2))
+            finally:
+                await store.close()
+
+    asyncio.run(_main())
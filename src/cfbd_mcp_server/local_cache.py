@@ -0,0 +1,131 @@
+"""
+In-process cache tier that sits in front of Redis.
+
+Entries are bounded by total size in bytes (not entry count), expire on their
+own TTL and are evicted least-recently-used first.
+"""
+
+import json
+import time
+from collections import OrderedDict
+from typing import Any
+
+_UNSET = object()
+
+# Parsed JSON objects take several times the size of their text
+PARSED_SIZE_FACTOR = 4
+
+
+class Payload:
+    """
+    A CFBD response body plus its soft-expiry time.
+
+    The parsed JSON is memoized for bodies up to `memo_limit` characters so
+    hot, small payloads are parsed once; larger ones are parsed on demand and
+    not kept alive.
+
+    A negative entry (a cached 400/404) carries the HTTP status in `status`
+    and the error body in `text`.
+    """
+
+    __slots__ = ("text", "soft_expiry", "memo_limit", "status", "_data")
+
+    def __init__(self, text: str, soft_expiry: float | None = None, memo_limit: int = 0,
+                 status: int | None = None):
+        self.text = text
+        self.soft_expiry = soft_expiry
+        self.memo_limit = memo_limit
+        self.status = status
+        self._data = _UNSET
+
+    @property
+    def data(self) -> Any:
+        if self._data is not _UNSET:
+            return self._data
+        data = json.loads(self.text)
+        if len(self.text) <= self.memo_limit:
+            self._data = data
+        return data
+
+    def remember(self, data: Any) -> None:
+        """Keep already-parsed JSON if the body is small enough to memoize."""
+        if len(self.text) <= self.memo_limit:
+            self._data = data
+
+    @property
+    def size(self) -> int:
+        return len(self.text) * (PARSED_SIZE_FACTOR if len(self.text) <= self.memo_limit else 1)
+
+
+class LocalCache:
+    """
+    Size-bounded LRU cache with per-entry expiry.
+    """
+
+    def __init__(self, max_bytes: int, max_entry_bytes: int | None = None):
+        """Initialize the cache.
+
+        Args:
+            max_bytes: Total size budget for all entries (0 disables the cache)
+            max_entry_bytes: Entries larger than this are never stored;
+                defaults to a quarter of max_bytes
+        """
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes if max_entry_bytes is not None else max_bytes // 4
+        self._entries: OrderedDict[str, tuple[Any, int, float]] = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # Turned off while entries cannot be kept coherent (e.g. no invalidation feed)
+        self.enabled = True
+
+    def get(self, key: str) -> Any | None:
+        if not self.enabled:
+            self.misses += 1
+            return None
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        value, _, expires_at = entry
+        if time.time() >= expires_at:
+            self.delete(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any, size: int, ttl: float) -> None:
+        self.delete(key)  # even when not storing: the old value is outdated
+        if not self.enabled or self.max_bytes <= 0 or size > self.max_entry_bytes or ttl <= 0:
+            return
+        self._entries[key] = (value, size, time.time() + ttl)
+        self._bytes += size
+        while self._bytes > self.max_bytes and self._entries:
+            _, (_, old_size, _) = self._entries.popitem(last=False)
+            self._bytes -= old_size
+            self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+        }
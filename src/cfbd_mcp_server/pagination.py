@@ -0,0 +1,56 @@
+"""
+Cursor-based pagination of large tool results.
+
+A result that is too big for one response is stored once as a snapshot and
+returned a page at a time; identical results map to the same snapshot. The cursor handed to the model is opaque: a
+base64url-encoded reference to the snapshot plus the next offset.
+"""
+
+import base64
+import hashlib
+import json
+from typing import Any, Callable
+
+
+class CursorError(ValueError):
+    """Raised for malformed or expired cursors."""
+
+
+def result_snapshot_id(tool: str, text: str) -> str:
+    """Snapshot id derived from the tool and the rendered result."""
+    digest = hashlib.blake2b(f"{tool}\0{text}".encode("utf-8"), digest_size=12).digest()
+    return base64.urlsafe_b64encode(digest).decode("ascii")
+
+
+def encode_cursor(snapshot_id: str, offset: int, page_size: int) -> str:
+    raw = json.dumps({"s": snapshot_id, "o": offset, "n": page_size}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[str, int, int]:
+    """Return (snapshot id, offset, page size) from a cursor string."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return str(raw["s"]), int(raw["o"]), int(raw["n"])
+    except Exception:
+        raise CursorError("Invalid cursor")
+
+
+def cut_page(items: list, offset: int, page_size: int, max_bytes: int,
+             render_item: Callable[[Any], str]) -> tuple[list[str], int]:
+    """Render items from `offset` until page_size records or max_bytes is reached.
+
+    Always includes at least one record. Returns (rendered items, next offset).
+    """
+    pieces: list[str] = []
+    size = 2  # brackets
+    end = offset
+    while end < len(items) and len(pieces) < page_size:
+        piece = render_item(items[end])
+        if pieces and size + len(piece) + 1 > max_bytes:
+            break
+        pieces.append(piece)
+        size += len(piece) + 1
+        end += 1
+    return pieces, end
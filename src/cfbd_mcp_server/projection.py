@@ -0,0 +1,92 @@
+"""
+Field projection of CFBD responses.
+
+A tool call may pass `fields`, a list of dotted paths such as
+["offense", "down", "distance", "clock.minutes"]. Paths are checked against
+the endpoint's response TypedDict, then each record is reduced to just those
+fields before rendering. Lists are projected element by element, so
+"teams.school" works on /games/teams.
+"""
+
+from typing import Any, Type, Union, get_args, get_origin, get_type_hints
+
+# A compiled projection: field name -> nested projection (None = keep whole value)
+FieldTree = dict[str, "FieldTree | None"]
+
+
+def _unwrap(type_hint: Any) -> Any:
+    """Strip Optional[...] and List[...] to reach the element type."""
+    while True:
+        origin = get_origin(type_hint)
+        if origin is Union:
+            type_hint = next(t for t in get_args(type_hint) if t is not type(None))
+        elif origin is list:
+            type_hint = get_args(type_hint)[0]
+        else:
+            return type_hint
+
+
+def _is_typed_dict(type_hint: Any) -> bool:
+    return isinstance(type_hint, type) and hasattr(type_hint, "__total__") and hasattr(type_hint, "__annotations__")
+
+
+def compile_fields(response_type: Type, fields: list[str]) -> FieldTree:
+    """Validate dotted field paths against a response TypedDict and build a projection tree.
+
+    Raises:
+        ValueError: if a path does not exist in the response schema
+    """
+    tree: FieldTree = {}
+    for path in fields:
+        if not isinstance(path, str) or not path:
+            raise ValueError("fields must be a list of non-empty strings")
+        node = tree
+        current = response_type
+        parts = path.split(".")
+        for i, part in enumerate(parts):
+            hints = get_type_hints(current) if _is_typed_dict(current) else {}
+            if part not in hints:
+                where = ".".join(parts[:i]) or current.__name__
+                valid = ", ".join(sorted(hints)) or "none (not an object)"
+                raise ValueError(f"Unknown field '{path}': '{part}' is not in {where} (valid: {valid})")
+            last = i == len(parts) - 1
+            if last:
+                node[part] = None
+            else:
+                child = node.get(part, {})
+                if child is None:  # parent already kept whole
+                    break
+                node[part] = child
+                node = child
+                current = _unwrap(hints[part])
+    return tree
+
+
+def _camel(name: str) -> str:
+    head, *rest = name.split("_")
+    return head + "".join(p[:1].upper() + p[1:] for p in rest)
+
+
+def _lookup(record: dict, key: str) -> tuple[bool, Any]:
+    # Some CFBD responses use camelCase where the TypedDicts use snake_case
+    if key in record:
+        return True, record[key]
+    alt = _camel(key)
+    if alt in record:
+        return True, record[alt]
+    return False, None
+
+
+def project(data: Any, tree: FieldTree) -> Any:
+    """Apply a projection tree to a record, a list of records, or nested lists."""
+    if isinstance(data, list):
+        return [project(item, tree) for item in data]
+    if not isinstance(data, dict):
+        return data
+    out = {}
+    for key, subtree in tree.items():
+        found, value = _lookup(data, key)
+        if not found:
+            continue
+        out[key] = value if subtree is None or value is None else project(value, subtree)
+    return out
@@ -0,0 +1,370 @@
+"""
+Small, safe query language evaluated over a parsed CFBD response.
+
+Follow-up questions over a large payload (a week of /plays, a season of
+/drives) can be answered from the cached body instead of shipping megabytes
+to the model. Tool arguments:
+
+    filter:    boolean expression over record fields, e.g.
+               offense == "Alabama" and down == 3 and play_type in ["Rush", "Pass Reception"]
+    group_by:  list of field paths to group on
+    aggregate: list of "count", "sum:<field>", "mean:<field>", "min:<field>",
+               "max:<field>" or "rate:<expression>" (share of records where the
+               expression is true, e.g. "rate:yards_gained >= distance")
+    sort:      list of fields (or aggregate names), "-" prefix for descending
+    limit:     maximum number of rows returned
+
+Expressions support ==, !=, <, <=, >, >=, in, not in, and, or, not,
+parentheses, dotted field paths, numbers, quoted strings, true, false and null.
+Nothing is ever passed to eval().
+"""
+
+import re
+from typing import Any, Callable, Type
+
+from .projection import compile_fields, _lookup
+
+MAX_LIMIT = 10000
+# Bounds on one expression, so parsing and evaluation stay well inside Python's recursion limit
+MAX_EXPRESSION_LENGTH = 2000
+MAX_NESTING = 32
+AGGREGATES = ("count", "sum", "mean", "min", "max", "rate")
+
+_TOKEN = re.compile(r"""
+    \s*(?:
+      (?P<num>-?\d+(?:\.\d+)?)
+    | (?P<str>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')
+    | (?P<op>==|!=|<=|>=|<|>)
+    | (?P<punct>[()\[\],])
+    | (?P<name>[A-Za-z_][A-Za-z0-9_.]*)
+    )""", re.VERBOSE)
+
+_ESCAPE = re.compile(r"""\\([\\"'])""")
+
+_KEYWORDS = {"and", "or", "not", "in", "true", "false", "null"}
+_LITERALS = {"true": True, "false": False, "null": None}
+
+Expr = Callable[[dict], Any]
+
+
+class QueryError(ValueError):
+    """Raised for malformed query arguments."""
+
+
+def get_path(record: Any, path: str) -> Any:
+    """Resolve a dotted path in a record (None if any step is missing)."""
+    value = record
+    for part in path.split("."):
+        if not isinstance(value, dict):
+            return None
+        found, value = _lookup(value, part)
+        if not found:
+            return None
+    return value
+
+
+def _tokenize(text: str) -> list[tuple[str, str]]:
+    tokens = []
+    pos = 0
+    text = text.rstrip()
+    while pos < len(text):
+        match = _TOKEN.match(text, pos)
+        if not match or match.end() == pos:
+            raise QueryError(f"Unexpected character in filter at position {pos}: {text[pos:pos + 10]!r}")
+        kind = match.lastgroup
+        tokens.append((kind, match.group(kind)))
+        pos = match.end()
+    return tokens
+
+
+class _Parser:
+    """Recursive-descent parser producing closures over a record."""
+
+    def __init__(self, text: str, check_path: Callable[[str], None]):
+        if len(text) > MAX_EXPRESSION_LENGTH:
+            raise QueryError(f"Expression is too long ({len(text)} characters, max {MAX_EXPRESSION_LENGTH})")
+        self.tokens = _tokenize(text)
+        self.pos = 0
+        self.depth = 0
+        self.check_path = check_path
+
+    def _nest(self) -> None:
+        self.depth += 1
+        if self.depth > MAX_NESTING:
+            raise QueryError(f"Expression is nested too deeply (max {MAX_NESTING} levels)")
+
+    def _peek(self) -> tuple[str, str] | None:
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def _next(self) -> tuple[str, str]:
+        token = self._peek()
+        if token is None:
+            raise QueryError("Unexpected end of filter expression")
+        self.pos += 1
+        return token
+
+    def _accept(self, value: str) -> bool:
+        token = self._peek()
+        if token is not None and token[1] == value:
+            self.pos += 1
+            return True
+        return False
+
+    def _expect(self, value: str) -> None:
+        if not self._accept(value):
+            raise QueryError(f"Expected '{value}' in filter expression")
+
+    def parse(self) -> Expr:
+        expr = self._or()
+        if self._peek() is not None:
+            raise QueryError(f"Unexpected token in filter: {self._peek()[1]!r}")
+        return expr
+
+    def _or(self) -> Expr:
+        left = self._and()
+        while self._accept("or"):
+            right = self._and()
+            left = (lambda l, r: lambda rec: bool(l(rec)) or bool(r(rec)))(left, right)
+        return left
+
+    def _and(self) -> Expr:
+        left = self._not()
+        while self._accept("and"):
+            right = self._not()
+            left = (lambda l, r: lambda rec: bool(l(rec)) and bool(r(rec)))(left, right)
+        return left
+
+    def _not(self) -> Expr:
+        if self._accept("not"):
+            self._nest()
+            inner = self._not()
+            self.depth -= 1
+            return lambda rec: not inner(rec)
+        return self._comparison()
+
+    def _comparison(self) -> Expr:
+        left = self._operand()
+        token = self._peek()
+        if token is None:
+            return left
+        if token[0] == "op":
+            self.pos += 1
+            right = self._operand()
+            return _compare(token[1], left, right)
+        negate = False
+        if token[1] == "not" and self.pos + 1 < len(self.tokens) and self.tokens[self.pos + 1][1] == "in":
+            self.pos += 1
+            negate = True
+        if self._accept("in"):
+            values = self._list()
+            if negate:
+                return lambda rec: left(rec) not in values
+            return lambda rec: left(rec) in values
+        return left
+
+    def _list(self) -> list:
+        self._expect("[")
+        values = []
+        if not self._accept("]"):
+            while True:
+                values.append(self._literal())
+                if self._accept("]"):
+                    break
+                self._expect(",")
+        return values
+
+    def _literal(self) -> Any:
+        kind, value = self._next()
+        if kind == "num":
+            return float(value) if "." in value else int(value)
+        if kind == "str":
+            return _ESCAPE.sub(r"\1", value[1:-1])  # only \\, \" and \' are escapes
+        if kind == "name" and value in _LITERALS:
+            return _LITERALS[value]
+        raise QueryError(f"Expected a literal value, got {value!r}")
+
+    def _operand(self) -> Expr:
+        token = self._peek()
+        if token is None:
+            raise QueryError("Unexpected end of filter expression")
+        kind, value = token
+        if value == "(":
+            self.pos += 1
+            self._nest()
+            inner = self._or()
+            self._expect(")")
+            self.depth -= 1
+            return inner
+        if kind == "name" and value not in _KEYWORDS:
+            self.pos += 1
+            self.check_path(value)
+            return lambda rec: get_path(rec, value)
+        literal = self._literal()
+        return lambda rec: literal
+
+
+def _compare(op: str, left: Expr, right: Expr) -> Expr:
+    def compare(rec: dict) -> bool:
+        a, b = left(rec), right(rec)
+        if op == "==":
+            return a == b
+        if op == "!=":
+            return a != b
+        try:
+            if op == "<":
+                return a < b
+            if op == "<=":
+                return a <= b
+            if op == ">":
+                return a > b
+            return a >= b
+        except TypeError:  # None or mixed types never match an ordering
+            return False
+    return compare
+
+
+def _numbers(values) -> list[float]:
+    return [v for v in values if isinstance(v, (int, float)) and not isinstance(v, bool)]
+
+
+class Query:
+    """
+    A compiled set of query arguments.
+    """
+
+    def __init__(self, where: Expr | None, group_by: list[str], aggregates: list[tuple[str, str, Expr | None]],
+                 sort: list[str], limit: int | None):
+        self.where = where
+        self.group_by = group_by
+        self.aggregates = aggregates
+        self.sort = sort
+        self.limit = limit
+
+    @property
+    def aggregating(self) -> bool:
+        return bool(self.group_by or self.aggregates)
+
+    def _aggregate(self, rows: list) -> dict:
+        out = {}
+        for out_name, op, arg in self.aggregates:
+            if op == "count":
+                out[out_name] = len(rows)
+                continue
+            if op == "rate":
+                out[out_name] = round(sum(1 for r in rows if arg(r)) / len(rows), 4) if rows else None
+                continue
+            values = _numbers(arg(r) for r in rows)
+            if op == "sum":
+                out[out_name] = sum(values)
+            elif op == "mean":
+                out[out_name] = round(sum(values) / len(values), 4) if values else None
+            elif op == "min":
+                out[out_name] = min(values) if values else None
+            elif op == "max":
+                out[out_name] = max(values) if values else None
+        return out
+
+    def apply(self, data: Any) -> Any:
+        if not isinstance(data, list):
+            raise QueryError("filter/group_by/aggregate/sort/limit only apply to list results")
+        rows = [r for r in data if self.where(r)] if self.where else data
+
+        if self.aggregating:
+            groups: dict[tuple, list] = {}
+            if self.group_by:
+                for r in rows:
+                    groups.setdefault(tuple(get_path(r, p) for p in self.group_by), []).append(r)
+            else:
+                groups[()] = rows
+            rows = [
+                dict(zip(self.group_by, key), **self._aggregate(members))
+                for key, members in groups.items()
+            ]
+
+        for spec in reversed(self.sort):
+            desc = spec.startswith("-")
+            path = spec.lstrip("-")
+            if self.aggregating:  # output rows are keyed by the literal name, e.g. "clock.minutes"
+                value = lambda r: r.get(path)
+            else:
+                value = lambda r: get_path(r, path)
+            present = [r for r in rows if value(r) is not None]
+            missing = [r for r in rows if value(r) is None]
+            try:
+                present.sort(key=value, reverse=desc)
+            except TypeError:
+                present.sort(key=lambda r: str(value(r)), reverse=desc)
+            rows = present + missing  # nulls last either way
+
+        if self.limit is not None:
+            rows = rows[:self.limit]
+        return rows
+
+
+QUERY_OPTIONS = ("filter", "group_by", "aggregate", "sort", "limit")
+
+
+def _as_list(name: str, value) -> list[str]:
+    if isinstance(value, str):
+        return [value]
+    if isinstance(value, list) and all(isinstance(v, str) for v in value):
+        return value
+    raise QueryError(f"{name} must be a string or a list of strings")
+
+
+def compile_query(options: dict, response_type: Type) -> Query | None:
+    """Build a Query from tool output options, validating field paths against the response schema.
+
+    Returns None if no query option was given.
+    """
+    if not any(k in options for k in QUERY_OPTIONS):
+        return None
+
+    def check_path(path: str) -> None:
+        compile_fields(response_type, [path])
+
+    where = None
+    if options.get("filter"):
+        if not isinstance(options["filter"], str):
+            raise QueryError("filter must be a string expression")
+        where = _Parser(options["filter"], check_path).parse()
+
+    group_by = _as_list("group_by", options.get("group_by", []))
+    for path in group_by:
+        check_path(path)
+
+    aggregates = []
+    for spec in _as_list("aggregate", options.get("aggregate", [])):
+        op, _, arg = spec.partition(":")
+        op, arg = op.strip(), arg.strip()
+        if op not in AGGREGATES:
+            raise QueryError(f"Unknown aggregate '{op}' (valid: {', '.join(AGGREGATES)})")
+        if op == "count":
+            aggregates.append(("count", "count", None))
+        elif not arg:
+            raise QueryError(f"Aggregate '{op}' needs a field, e.g. '{op}:yards_gained'")
+        elif op == "rate":
+            aggregates.append((f"rate({arg})", op, _Parser(arg, check_path).parse()))
+        else:
+            check_path(arg)
+            aggregates.append((f"{op}_{arg.replace('.', '_')}", op, (lambda p: lambda r: get_path(r, p))(arg)))
+    if group_by and not aggregates:
+        aggregates.append(("count", "count", None))
+
+    sort = _as_list("sort", options.get("sort", []))
+    output_names = set(group_by) | {name for name, _, _ in aggregates}
+    for spec in sort:
+        path = spec.lstrip("-")
+        if aggregates:
+            if path not in output_names:
+                raise QueryError(f"Cannot sort by '{path}': not a group_by field or aggregate "
+                                 f"(valid: {', '.join(sorted(output_names))})")
+        else:
+            check_path(path)
+
+    limit = options.get("limit")
+    if limit is not None:
+        if not isinstance(limit, int) or isinstance(limit, bool) or not 1 <= limit <= MAX_LIMIT:
+            raise QueryError(f"limit must be an integer between 1 and {MAX_LIMIT}")
+
+    return Query(where, group_by, aggregates, sort, limit)
@@ -0,0 +1,193 @@
+"""
+Async token-bucket rate limiter for upstream CFBD calls.
+
+Requests that cannot get a token right away are queued (never failed) and
+released in priority order, so interactive tool calls go ahead of background
+refresh/prefetch traffic. A call queued with a Priority handle can be moved
+up while it waits, e.g. when an interactive caller joins a background fetch.
+A monthly call budget can be enforced on top of the per-second rate.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from datetime import datetime, timezone
+
+logger = logging.getLogger(__name__)
+
+# Lower value = served first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 10
+
+
+class QuotaExhausted(Exception):
+    """Raised when the monthly upstream call budget has been spent."""
+
+
+class Priority:
+    """
+    Priority of one logical upstream call (all its retries) that can be raised while queued.
+    """
+
+    __slots__ = ("value", "_limiter", "_fut")
+
+    def __init__(self, value: int = PRIORITY_INTERACTIVE):
+        self.value = value
+        self._limiter: "RateLimiter | None" = None
+        self._fut: asyncio.Future | None = None
+
+    def raise_to(self, value: int) -> None:
+        """Lower the value (serve sooner); a pending acquire is moved up the queue."""
+        if value >= self.value:
+            return
+        self.value = value
+        if self._limiter is not None and self._fut is not None and not self._fut.done():
+            self._limiter._reprioritize(self._fut, value)
+
+
+def _current_month() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m")
+
+
+class RateLimiter:
+    """
+    Token bucket with a priority wait queue and an optional monthly budget.
+    """
+
+    def __init__(self, rate: float, burst: int | None = None, monthly_budget: int = 0):
+        """Initialize the limiter.
+
+        Args:
+            rate: Sustained calls per second (0 disables rate limiting)
+            burst: Bucket size; defaults to max(1, rate)
+            monthly_budget: Maximum calls per calendar month (0 = unlimited)
+        """
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1, int(rate))
+        self.monthly_budget = monthly_budget
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._dispatcher: asyncio.Task | None = None
+        self._month = _current_month()
+        self._month_calls = 0
+        # stats
+        self._granted = 0
+        self._queued = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._max_depth = 0
+        self._reprioritized = 0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _take(self) -> bool:
+        if self.rate <= 0:
+            return True
+        self._refill()
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return True
+        return False
+
+    def _charge_budget(self) -> None:
+        month = _current_month()
+        if month != self._month:
+            self._month = month
+            self._month_calls = 0
+        if self.monthly_budget and self._month_calls >= self.monthly_budget:
+            raise QuotaExhausted(
+                f"Monthly CFBD call budget of {self.monthly_budget} reached for {month}"
+            )
+        self._month_calls += 1
+
+    def _record(self, waited: float) -> None:
+        self._granted += 1
+        self._total_wait += waited
+        self._max_wait = max(self._max_wait, waited)
+
+    async def acquire(self, priority: int | Priority = PRIORITY_INTERACTIVE) -> float:
+        """Wait for a token. Returns the seconds spent queued.
+
+        Raises:
+            QuotaExhausted: if the monthly budget is spent
+        """
+        self._charge_budget()
+        if not self._waiters and self._take():
+            self._record(0.0)
+            return 0.0
+
+        enqueued = time.monotonic()
+        fut = asyncio.get_running_loop().create_future()
+        handle = priority if isinstance(priority, Priority) else None
+        if handle is not None:
+            priority = handle.value
+            handle._limiter, handle._fut = self, fut
+        heapq.heappush(self._waiters, (priority, next(self._seq), fut))
+        self._queued += 1
+        self._max_depth = max(self._max_depth, self.queue_depth)
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch())
+        try:
+            await fut
+        except asyncio.CancelledError:
+            # Refund the call if we were cancelled before being granted
+            if not (fut.done() and not fut.cancelled()):
+                self._month_calls = max(0, self._month_calls - 1)
+            raise
+        finally:
+            if handle is not None:
+                handle._limiter = handle._fut = None
+        waited = time.monotonic() - enqueued
+        self._record(waited)
+        if waited > 1:
+            logger.debug("CFBD rate limiter: waited %.2fs (priority=%d)", waited, priority)
+        return waited
+
+    def _reprioritize(self, fut: asyncio.Future, priority: int) -> None:
+        for i, (current, seq, waiter) in enumerate(self._waiters):
+            if waiter is fut:
+                if priority < current:
+                    self._waiters[i] = (priority, seq, fut)
+                    heapq.heapify(self._waiters)
+                    self._reprioritized += 1
+                return
+
+    async def _dispatch(self) -> None:
+        while self._waiters:
+            _, _, fut = self._waiters[0]
+            if fut.done():  # cancelled while queued
+                heapq.heappop(self._waiters)
+                continue
+            if self._take():
+                heapq.heappop(self._waiters)
+                fut.set_result(None)
+                continue
+            await asyncio.sleep(max(0.0, (1 - self._tokens) / self.rate))
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(1 for _, _, fut in self._waiters if not fut.done())
+
+    def stats(self) -> dict:
+        """Return a snapshot of limiter counters for capacity sizing."""
+        return {
+            "rate_per_sec": self.rate,
+            "burst": self.burst,
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self._max_depth,
+            "granted": self._granted,
+            "queued": self._queued,
+            "avg_wait_ms": round(self._total_wait / self._granted * 1000, 1) if self._granted else 0.0,
+            "max_wait_ms": round(self._max_wait * 1000, 1),
+            "reprioritized": self._reprioritized,
+            "month": self._month,
+            "month_calls": self._month_calls,
+            "monthly_budget": self.monthly_budget or None,
+        }
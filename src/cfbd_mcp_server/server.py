@@ -5,10 +5,12 @@ import time
 import logging
 from importlib.metadata import metadata
 from dotenv import load_dotenv
-from typing import Any, TypedDict, Type, cast, Union
+from typing import Any, Callable, TypedDict, Type
 import httpx
 import hashlib
-from urllib.parse import urlparse
+import random
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse, parse_qsl
 from datetime import datetime, timezone
 import redis.asyncio as redis
 import json
@@ -19,6 +21,16 @@ from mcp.server import NotificationOptions, Server
 import mcp.server.stdio
 
 from .schema_helpers import create_tool_schema
+from .rate_limiter import RateLimiter, Priority, QuotaExhausted, PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND
+from .local_cache import LocalCache, Payload, PARSED_SIZE_FACTOR
+from .ttl_policy import TtlPolicy
+from .canonical import canonicalize_params
+from .cache_codec import encode_body, decode_body, decode_entry, encode_negative, resolve_codec
+from .projection import compile_fields, project
+from .query import compile_query, QueryError
+from .pagination import CursorError, result_snapshot_id, encode_cursor, decode_cursor, cut_page
+from .validators import compile_validators, validator_for
+from .team_index import TeamIndex
 
 from .cfbd_schema import (
     # Request parameter types
@@ -33,7 +45,7 @@ from .cfbd_schema import (
     CoachesResponse, BettingGame,
     
     # Constants
-    VALID_SEASONS, VALID_WEEKS, VALID_SEASON_TYPES, VALID_DIVISIONS
+    VALID_WEEKS, VALID_SEASON_TYPES, VALID_DIVISIONS, valid_seasons
 )
 
 # Load environment variables
@@ -45,6 +57,17 @@ API_KEY = os.getenv("CFB_API_KEY")
 API_BASE_URL = 'https://apinext.collegefootballdata.com/'
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/1")
 
+# Upstream HTTP connection pool (shared by every tool call)
+CFBD_HTTP2 = os.getenv("CFBD_HTTP2", "0").lower() in ("1", "true", "yes")
+CFBD_MAX_CONNECTIONS = int(os.getenv("CFBD_MAX_CONNECTIONS", "20"))
+CFBD_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("CFBD_MAX_KEEPALIVE_CONNECTIONS", "10"))
+CFBD_KEEPALIVE_EXPIRY = float(os.getenv("CFBD_KEEPALIVE_EXPIRY", "30"))
+
+# Upstream rate limiting (calls/sec token bucket + optional monthly budget)
+CFBD_RATE_LIMIT = float(os.getenv("CFBD_RATE_LIMIT", "5"))
+CFBD_RATE_BURST = int(os.getenv("CFBD_RATE_BURST", "0")) or None
+CFBD_MONTHLY_BUDGET = int(os.getenv("CFBD_MONTHLY_BUDGET", "0"))
+
 # --- Debug level (0=off, 1=basic, 2=verbose) ---
 DEBUG_LEVEL = int(os.getenv("DEBUG_LEVEL", "1"))
 logger = logging.getLogger("anthropic-server")
@@ -76,35 +99,36 @@ _redis: redis.Redis | None = None
 
 async def _get_redis() -> redis.Redis | None:
     """Create/return a shared async Redis client. Returns None if unavailable."""
-    global _redis
+    global _redis, _invalidation_task
     if _redis is not None:
         return _redis
     try:
-        _redis = await redis.from_url(REDIS_URL, decode_responses=True)  # store UTF-8 strings
+        _redis = await redis.from_url(REDIS_URL, decode_responses=False)  # bytes: bodies may be compressed
         await _redis.ping()
         _dbg(1, "Redis connected: %s", REDIS_URL)
+        if LOCAL_CACHE_PUBSUB:
+            _invalidation_task = asyncio.create_task(_listen_for_invalidations(_redis))
         return _redis
     except Exception as e:
         _dbg(1, "Redis unavailable (%s) — continuing without cache", e)
         return None
 
-# TTLs by endpoint path (no trailing slash)
-TTL_BY_ENDPOINT = {
-    "/lines":   5 * 60,                 # 5 minutes
-    "/coaches": 60 * 60 * 24 * 30,      # 30 days
-    # add more here as needed:
-    # "/games":   60 * 60,              # 1 hour
-    # "/records": 60 * 60 * 24,         # 1 day
-}
+# TTLs come from season-aware rules (see ttl_policy.py); CFBD_TTL_RULES may
+# point at a JSON file of extra rules checked before the built-in ones.
+ttl_policy = TtlPolicy.from_file(os.getenv("CFBD_TTL_RULES"))
 
 def _endpoint_path_from_url(full_url: str) -> str:
     """Normalize to a path without trailing slash, e.g. '/lines'."""
     p = urlparse(full_url).path
     return p[:-1] if p.endswith("/") and p != "/" else p
 
-def _ttl_for_endpoint_path(path: str) -> int:
-    path = _endpoint_path_from_url(path)
-    return TTL_BY_ENDPOINT.get(path, 60 * 60)  # default 1 hour if not listed
+def _ttl_rule_for_url(full_url: str) -> tuple[int, str]:
+    """Return (ttl seconds, matching rule name) for a full CFBD URL."""
+    params = dict(parse_qsl(urlparse(full_url).query))
+    return ttl_policy.resolve(_endpoint_path_from_url(full_url), params)
+
+def _ttl_for_url(full_url: str) -> int:
+    return _ttl_rule_for_url(full_url)[0]
 
 def _url_cache_key(full_url: str) -> str:
     """Hash the full URL to keep keys short and safe."""
@@ -113,7 +137,7 @@ def _url_cache_key(full_url: str) -> str:
 
 # Set up API client session
 async def get_api_client() -> httpx.AsyncClient:
-    """Create an API client with authentication headers."""
+    """Create an API client with authentication headers and a keep-alive pool."""
     # Pretty-print JSON bodies if possible
     def _pp_json(s: str) -> str:
         try:
@@ -149,6 +173,14 @@ async def get_api_client() -> httpx.AsyncClient:
         if DEBUG_LEVEL >= 2:
             _dbg(2, "CFBD resp headers: %s", dict(response.headers))
 
+    http2 = CFBD_HTTP2
+    if http2:
+        try:
+            import h2  # noqa: F401  (httpx needs it for HTTP/2)
+        except ImportError:
+            _dbg(1, "CFBD_HTTP2 requested but 'h2' is not installed — using HTTP/1.1")
+            http2 = False
+
     return httpx.AsyncClient(
         base_url=API_BASE_URL,
         headers={
@@ -156,161 +188,832 @@ async def get_api_client() -> httpx.AsyncClient:
             "Accept": "application/json"
         },
         timeout=30.0,
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=CFBD_MAX_CONNECTIONS,
+            max_keepalive_connections=CFBD_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=CFBD_KEEPALIVE_EXPIRY,
+        ),
         event_hooks={
             "request": [_log_req],
             "response": [_log_resp],
         },
     )
 
-@server.list_resources()
-async def handle_list_resources() -> list[types.Resource]:
-    """List available endpoint schemas as resources."""
-    return [
-        types.Resource(
-            uri="schema://games",
-            name="Games endpoint schema",
-            description="Get game information with scores, teams and metadata",
-            mimeType="text/plain"
-        ),
-        types.Resource(
-            uri="schema://records",
-            name="Team records endpoint schema",
-            description="Get team season records",
-            mimeType="text/plain"
-        ),
-        types.Resource(
-            uri="schema://plays",
-            name="Plays endpoint",
-            description="Schema for the /plays endpoint",
-            mimeType="text/plain"
-        ),
-        types.Resource(
-            uri="schema://drives",
-            name="Drives endpoint",
-            description="Schema for the /drives endpoint",
-            mimeType="text/plain"
-        ),
-        types.Resource(
-            uri="schema://plays/stats",
-            name="Play/stats endpoint",
-            description="Schema for the /plays/stats endpoint",
-            mimeType="text/plain"
-        ),
-        types.Resource(
-            uri="schema://rankings",
-            name="Rankings endpoint",
-            description="Schema for the /rankings endpoint",
-            mimeType="text/plain"
-        ),
-        types.Resource(
-            uri="schema://roster",
-            name="Roster endpoint",
-            description="Schema for the /roster endpoint",
-            mimeType="text/plain"
-        ),
-        types.Resource(
-            uri="schema://coaches",
-            name="Coaches endpoint",
-            description="Schema for the /coaches endpoint",
-            mimeType="text/plain"
-        ),
-        types.Resource(
-            uri="schema://lines",
-            name="Lines endpoint",
-            description="Schema for the /lines endpoint",
-            mimeType="text/plain"
-        ),
-        types.Resource(
-            uri="schema://metrics/wp/pregame",
-            name="Metrics/wp/pregame endpoint",
-            description="Schema for the pregame win probability endpoint",
-            mimeType="text/plain"
-        ),
-        types.Resource(
-            uri="schema://game/box/advanced",
-            name="Advanced box score endpoint",
-            description="Schema for the advanced box score endpoint",
-            mimeType="text/plain"
-        )
-    ]
+# -----------------------------
+# Process-wide CFBD client
+# -----------------------------
+_api_client: httpx.AsyncClient | None = None
 
-@server.read_resource()
-async def handle_read_resource(uri: str) -> str:
-    """Return the schema for the requested endpoint."""
-    # Map URIs to schema classes
-    schema_map = {
-        "schema://games": {
-            "endpoint": "/games",
-            "parameters": getGames.__annotations__,
-            "response": GamesResponse.__annotations__,
-            "description": "Get game information for specified parameters"
-        },
-        "schema://records": {
-            "endpoint": "/records",
-            "parameters": getTeamRecords.__annotations__,
-            "response": TeamRecordResponse.__annotations__,
-            "description": "Get team records for specified parameters"
-        },
-        "schema://plays": {
-            "endpoint": "/plays",
-            "parameters": getPlays.__annotations__,
-            "response": PlaysResponse.__annotations__,
-            "description": "Get play records for specified parameters"
-        },
-        "schema://drives": {
-            "endpoint": "/drives",
-            "parameters": getDrives.__annotations__,
-            "response": DrivesResponse.__annotations__,
-            "description": "Get drive records for specified parameters"
-        },
-        "schema://plays/stats": {
-            "endpoint": "/plays/stats",
-            "parameters": getPlaysStats.__annotations__,
-            "response": PlaysStatsResponse.__annotations__,
-            "description": "Get play by play records for specified parameters"
-        },
-        "schema://rankings": {
-            "endpoint": "/rankings",
-            "parameters": getRankings.__annotations__,
-            "response": RankingsResponse.__annotations__,
-            "description": "Get rankings records for specified parameters"
-        },
-        "schema://roster": {
-            "endpoint": "/roster",
-            "parameters": getRoster.__annotations__,
-            "response": RosterResponse.__annotations__,
-            "description": "Get team roster information for specified parameters"
-        },
-        "schema://coaches": {
-            "endpoint": "/coaches",
-            "parameters": getCoaches.__annotations__,
-            "response": CoachesResponse.__annotations__,
-            "description": "Get coaches information for specified parameters"
-        },
-        "schema://lines": {
-            "endpoint": "/lines",
-            "parameters": getLines.__annotations__,
-            "response": BettingGame.__annotations__,
-            "description": "Get betting data lines for specified parameters"
-        },
-        "schema://metrics/wp/pregame": {
-            "endpoint": "/metrics/wp/pregame",
-            "parameters": getMetricsPregameWp.__annotations__,
-            "response": MetricsPregameWpResponse.__annotations__,
-            "description": "Get pregame win probability records for specified parameters"
-        },
-        "schema://game/box/advanced": {
-            "endpoint": "/game/box/advanced",
-            "parameters": getAdvancedBoxScore.__annotations__,
-            "response": AdvancedBoxScoreResponse.__annotations__,
-            "description": "Get advanced box score data"
-        }
+async def open_api_client() -> httpx.AsyncClient:
+    """Create/return the shared CFBD client so connections are reused across tool calls."""
+    global _api_client
+    if _api_client is None or _api_client.is_closed:
+        _api_client = await get_api_client()
+        _dbg(1, "CFBD client pool opened (max_connections=%d, keepalive=%d)",
+             CFBD_MAX_CONNECTIONS, CFBD_MAX_KEEPALIVE_CONNECTIONS)
+    _start_team_index(_api_client)
+    return _api_client
+
+async def close_api_client() -> None:
+    """Close the shared CFBD client (and the Redis connection) on shutdown."""
+    global _api_client, _redis, _invalidation_task, _team_index_task
+    if _team_index_task is not None:
+        _team_index_task.cancel()
+        _team_index_task = None
+    if _api_client is not None:
+        try:
+            await _api_client.aclose()
+            _dbg(1, "CFBD client pool closed")
+        except Exception as e:
+            _dbg(1, "CFBD client close error: %s", e)
+        _api_client = None
+    if _invalidation_task is not None:
+        _invalidation_task.cancel()
+        _invalidation_task = None
+    if _redis is not None:
+        try:
+            await _redis.aclose()
+        except Exception as e:
+            _dbg(1, "Redis close error: %s", e)
+        _redis = None
+
+# -----------------------------
+# URL fetch: cache → single-flight → CFBD
+# -----------------------------
+# Coalesce identical in-flight requests: the first caller for a URL fetches,
+# everyone else awaits the same task. Optionally extend this across workers
+# with a short Redis lock so only one process goes upstream per URL.
+SINGLEFLIGHT_REDIS_LOCK = os.getenv("CFBD_SINGLEFLIGHT_REDIS_LOCK", "0").lower() in ("1", "true", "yes")
+SINGLEFLIGHT_LOCK_TTL_MS = int(os.getenv("CFBD_SINGLEFLIGHT_LOCK_TTL_MS", "10000"))
+SINGLEFLIGHT_POLL_INTERVAL = float(os.getenv("CFBD_SINGLEFLIGHT_POLL_INTERVAL", "0.1"))
+
+_inflight: dict[str, asyncio.Task] = {}
+# Priority of each in-flight fetch, raised when a more urgent caller joins it
+_inflight_priority: dict[str, Priority] = {}
+
+# Retries for transient upstream failures. Attempts include the first try;
+# the deadline bounds the whole call including backoff sleeps.
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+RETRY_DEFAULTS = {
+    "attempts": int(os.getenv("CFBD_RETRY_ATTEMPTS", "3")),
+    "base_delay": float(os.getenv("CFBD_RETRY_BASE_DELAY", "0.5")),
+    "max_delay": float(os.getenv("CFBD_RETRY_MAX_DELAY", "8")),
+    "deadline": float(os.getenv("CFBD_CALL_DEADLINE", "45")),
+}
+# Per-endpoint overrides of RETRY_DEFAULTS
+RETRY_BY_ENDPOINT = {
+    "/plays":       {"deadline": 90.0},   # multi-MB payloads
+    "/plays/stats": {"deadline": 90.0},
+    "/lines":       {"attempts": 4},      # cheap and short-lived, worth another try
+}
+_RETRY_STATS = {"retries": 0}
+
+rate_limiter = RateLimiter(CFBD_RATE_LIMIT, burst=CFBD_RATE_BURST, monthly_budget=CFBD_MONTHLY_BUDGET)
+
+# Stale-while-revalidate. Each cached body carries a soft-expiry timestamp
+# (now + endpoint TTL); Redis keeps it for CACHE_MAX_STALE beyond that.
+#   fresh                       → serve
+#   stale ≤ CACHE_SWR_WINDOW    → serve now, refresh in the background
+#   stale ≤ CACHE_MAX_STALE     → fetch; serve the stale body only if CFBD errors
+CACHE_SWR = os.getenv("CFBD_CACHE_SWR", "1").lower() in ("1", "true", "yes")
+CACHE_SWR_WINDOW = int(os.getenv("CFBD_CACHE_SWR_WINDOW", "600"))
+CACHE_MAX_STALE = int(os.getenv("CFBD_CACHE_MAX_STALE", str(60 * 60 * 24)))
+_SWR_STATS = {"stale_served": 0, "stale_if_error": 0, "bg_refreshes": 0}
+
+# Optional compression of cached bodies ("none", "gzip" or "zstd"); bodies
+# smaller than the threshold are stored as-is. See cache_codec.py for the format.
+CACHE_CODEC = resolve_codec(os.getenv("CFBD_CACHE_COMPRESSION", "none"))
+CACHE_COMPRESS_MIN_BYTES = int(os.getenv("CFBD_CACHE_COMPRESS_MIN_BYTES", "4096"))
+
+# Deterministic failures (bad parameters, unknown resources) are remembered
+# briefly so a model retrying the same bad query does not reach CFBD again.
+# 0 disables negative caching.
+CACHE_NEGATIVE_TTL = int(os.getenv("CFBD_CACHE_NEGATIVE_TTL", "300"))
+NEGATIVE_STATUS = {400, 404}
+_NEGATIVE_STATS = {"hits": 0, "misses": 0}
+
+# In-process tier in front of Redis, bounded by bytes. Small bodies also keep
+# their parsed JSON so hot payloads skip both the Redis round-trip and json.loads.
+# With pub/sub enabled, every Redis write tells the other workers to drop their copy.
+LOCAL_CACHE_MAX_BYTES = int(os.getenv("CFBD_LOCAL_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+LOCAL_CACHE_MEMO_BYTES = int(os.getenv("CFBD_LOCAL_CACHE_MEMO_BYTES", str(256 * 1024)))
+LOCAL_CACHE_PUBSUB = os.getenv("CFBD_LOCAL_CACHE_PUBSUB", "0").lower() in ("1", "true", "yes")
+INVALIDATION_CHANNEL = "cfbd:invalidate"
+
+local_cache = LocalCache(LOCAL_CACHE_MAX_BYTES)
+_WORKER_ID = f"{os.getpid()}-{random.getrandbits(32):08x}"
+_invalidation_task: asyncio.Task | None = None
+
+def _lock_key(cache_key: str) -> str:
+    return cache_key.replace("cfbd:url:", "cfbd:lock:", 1)
+
+def _new_payload(full_url: str, raw_text: str, data: Any = None) -> Payload:
+    ttl = _ttl_for_url(full_url)
+    payload = Payload(raw_text, time.time() + ttl, LOCAL_CACHE_MEMO_BYTES)
+    if data is not None:
+        payload.remember(data)
+    return payload
+
+def _local_put(cache_key: str, full_url: str, payload: Payload) -> None:
+    """Keep a fresh payload in the in-process tier until its soft expiry."""
+    if payload.soft_expiry is not None:
+        ttl = payload.soft_expiry - time.time()
+    else:
+        ttl = _ttl_for_url(full_url)
+    local_cache.set(cache_key, payload, payload.size, ttl)
+
+async def _cache_get(r: redis.Redis | None, cache_key: str) -> Payload | None:
+    """Return the cached payload for a URL from Redis, or None on miss."""
+    if r is None:
+        return None
+    try:
+        value = await r.get(cache_key)
+    except Exception as e:
+        _dbg(1, "CFBD cache get error: %s", e)
+        return None
+    if not value:
+        return None
+    try:
+        body, soft_expiry, status = decode_entry(value)
+    except Exception as e:
+        _dbg(1, "CFBD cache decode error: %s", e)
+        return None
+    return Payload(body, soft_expiry, LOCAL_CACHE_MEMO_BYTES, status)
+
+async def _cache_get_many(r: redis.Redis | None, cache_keys: list[str]) -> list[Payload | None]:
+    """Look up several URLs with one MGET; None for misses and undecodable entries."""
+    if r is None or not cache_keys:
+        return [None] * len(cache_keys)
+    try:
+        values = await r.mget(cache_keys)
+    except Exception as e:
+        _dbg(1, "CFBD cache mget error: %s", e)
+        return [None] * len(cache_keys)
+    payloads: list[Payload | None] = []
+    for value in values:
+        payload = None
+        if value:
+            try:
+                body, soft_expiry, status = decode_entry(value)
+                payload = Payload(body, soft_expiry, LOCAL_CACHE_MEMO_BYTES, status)
+            except Exception as e:
+                _dbg(1, "CFBD cache decode error: %s", e)
+        payloads.append(payload)
+    return payloads
+
+async def _cache_set(r: redis.Redis | None, cache_key: str, full_url: str, payload: Payload) -> None:
+    _local_put(cache_key, full_url, payload)
+    if r is None:
+        return
+    try:
+        ttl = max(1, int(payload.soft_expiry - time.time()))
+        if CACHE_SWR:
+            value = encode_body(payload.text, payload.soft_expiry, CACHE_CODEC, CACHE_COMPRESS_MIN_BYTES)
+            ex = ttl + max(CACHE_SWR_WINDOW, CACHE_MAX_STALE)
+        else:
+            value = encode_body(payload.text, None, CACHE_CODEC, CACHE_COMPRESS_MIN_BYTES)
+            ex = ttl
+        await r.set(cache_key, value, ex=ex)
+        _dbg(1, "CFBD cache SET: %s (%s, ttl=%ds, rule=%s)", cache_key,
+             _endpoint_path_from_url(full_url), ttl, _ttl_rule_for_url(full_url)[1])
+        if LOCAL_CACHE_PUBSUB:
+            await r.publish(INVALIDATION_CHANNEL, f"{_WORKER_ID} {cache_key}")
+    except Exception as e:
+        _dbg(1, "CFBD cache set error: %s", e)
+
+async def _cache_set_negative(r: redis.Redis | None, cache_key: str, full_url: str,
+                              error: httpx.HTTPStatusError) -> None:
+    """Remember a 400/404 for CACHE_NEGATIVE_TTL seconds under the URL's own key."""
+    status = error.response.status_code
+    payload = Payload(error.response.text, time.time() + CACHE_NEGATIVE_TTL, 0, status)
+    local_cache.set(cache_key, payload, len(payload.text), CACHE_NEGATIVE_TTL)
+    if r is None:
+        return
+    try:
+        await r.set(cache_key, encode_negative(status, payload.text, payload.soft_expiry), ex=CACHE_NEGATIVE_TTL)
+        _dbg(1, "CFBD cache SET negative: %s (%s, status=%d, ttl=%ds)", cache_key,
+             _endpoint_path_from_url(full_url), status, CACHE_NEGATIVE_TTL)
+        if LOCAL_CACHE_PUBSUB:
+            await r.publish(INVALIDATION_CHANNEL, f"{_WORKER_ID} {cache_key}")
+    except Exception as e:
+        _dbg(1, "CFBD cache set error: %s", e)
+
+def _raise_if_negative(req: httpx.Request, payload: Payload) -> Payload:
+    """Re-raise a cached error response as the HTTPStatusError CFBD originally caused."""
+    if payload.status is None:
+        return payload
+    _NEGATIVE_STATS["hits"] += 1
+    _dbg(1, "CFBD negative cache HIT (%d): %s", payload.status, str(req.url))
+    httpx.Response(payload.status, text=payload.text, request=req).raise_for_status()
+    return payload  # not reached: status is always an error
+
+INVALIDATION_RETRY_MAX_DELAY = 30.0
+
+async def _listen_for_invalidations(r: redis.Redis) -> None:
+    """Drop local entries that another worker has just rewritten in Redis.
+
+    The local tier is only used while subscribed: when the subscription is lost
+    it is cleared and disabled, and the listener resubscribes with backoff.
+    """
+    delay = 1.0
+    while True:
+        local_cache.enabled = False
+        pubsub = None
+        try:
+            pubsub = r.pubsub()
+            await pubsub.subscribe(INVALIDATION_CHANNEL)
+            _dbg(1, "Local cache invalidation listener subscribed (%s)", _WORKER_ID)
+            local_cache.enabled = True
+            delay = 1.0
+            async for message in pubsub.listen():
+                if message.get("type") != "message":
+                    continue
+                sender, _, cache_key = message["data"].decode("utf-8").partition(" ")
+                if sender != _WORKER_ID:
+                    local_cache.delete(cache_key)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            _dbg(1, "Local cache invalidation listener stopped: %s — retrying in %.0fs", e, delay)
+        finally:
+            local_cache.enabled = False
+            local_cache.clear()  # can no longer trust local copies
+            if pubsub is not None:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, INVALIDATION_RETRY_MAX_DELAY)
+
+def _is_fresh(soft_expiry: float | None) -> bool:
+    return soft_expiry is None or time.time() < soft_expiry
+
+def _upstream_is_erroring(e: Exception) -> bool:
+    """Errors for which a stale body is better than nothing (not 4xx client errors)."""
+    if isinstance(e, httpx.HTTPStatusError):
+        return e.response.status_code in RETRYABLE_STATUS or e.response.status_code >= 500
+    # A spent monthly budget means no fresh data at all until it resets
+    return isinstance(e, (httpx.RequestError, QuotaExhausted))
+
+def _retry_policy(full_url: str) -> dict:
+    policy = dict(RETRY_DEFAULTS)
+    policy.update(RETRY_BY_ENDPOINT.get(_endpoint_path_from_url(full_url), {}))
+    return policy
+
+def _retry_after_seconds(response: httpx.Response) -> float | None:
+    """Parse a Retry-After header (delta-seconds or HTTP-date)."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+        return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+def _backoff_delay(attempt: int, policy: dict) -> float:
+    """Exponential backoff with full jitter."""
+    return random.uniform(0, min(policy["max_delay"], policy["base_delay"] * (2 ** attempt)))
+
+async def _fetch_upstream(client: httpx.AsyncClient, req: httpx.Request,
+                          priority: int | Priority = PRIORITY_INTERACTIVE) -> str:
+    """Send one request to CFBD and return the raw JSON body (raises on HTTP errors).
+
+    429/5xx responses, timeouts and dropped connections are retried with
+    backoff (honoring Retry-After) as long as the per-call deadline allows.
+    """
+    full_url = str(req.url)
+    policy = _retry_policy(full_url)
+    deadline = time.monotonic() + policy["deadline"]
+    attempt = 0
+    while True:
+        waited = await rate_limiter.acquire(priority)
+        if waited:
+            _dbg(1, "CFBD rate limiter: queued %.1fms (depth=%d)", waited * 1000, rate_limiter.queue_depth)
+        remaining = deadline - time.monotonic()
+        req.extensions["timeout"] = httpx.Timeout(max(1.0, min(30.0, remaining))).as_dict()
+        start = time.monotonic()
+        _dbg(1, "→ CFBD %s %s", req.method, full_url)
+        retry_after = None
+        try:
+            response = await client.send(req)
+            elapsed_ms = (time.monotonic() - start) * 1000
+            _dbg(1, "← CFBD %s %s %d in %.1fms", req.method, full_url, response.status_code, elapsed_ms)
+            if DEBUG_LEVEL >= 2:
+                _dbg(2, "Response headers: %s", dict(response.headers))
+            response.raise_for_status()
+            return response.text
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code not in RETRYABLE_STATUS:
+                raise
+            retry_after = _retry_after_seconds(e.response)
+            error = e
+        except (httpx.TimeoutException, httpx.NetworkError, httpx.RemoteProtocolError) as e:
+            error = e
+
+        attempt += 1
+        delay = retry_after if retry_after is not None else _backoff_delay(attempt, policy)
+        if attempt >= policy["attempts"] or time.monotonic() + delay >= deadline:
+            _dbg(1, "CFBD giving up after %d attempt(s): %s", attempt, error)
+            raise error
+        _RETRY_STATS["retries"] += 1
+        _dbg(1, "CFBD retry %d/%d in %.2fs after: %s", attempt, policy["attempts"] - 1, delay, error)
+        await asyncio.sleep(delay)
+
+async def _wait_for_peer(r: redis.Redis, cache_key: str) -> Payload | None:
+    """Another worker holds the fetch lock: poll until it stores the body or the lock lapses."""
+    lock_key = _lock_key(cache_key)
+    deadline = time.monotonic() + SINGLEFLIGHT_LOCK_TTL_MS / 1000
+    while time.monotonic() < deadline:
+        await asyncio.sleep(SINGLEFLIGHT_POLL_INTERVAL)
+        cached = await _cache_get(r, cache_key)
+        if cached and _is_fresh(cached.soft_expiry):
+            return cached
+        try:
+            if not await r.exists(lock_key):
+                return None
+        except Exception:
+            return None
+    return None
+
+async def _fetch_and_store(client: httpx.AsyncClient, req: httpx.Request,
+                           r: redis.Redis | None, cache_key: str,
+                           priority: int | Priority = PRIORITY_INTERACTIVE) -> Payload:
+    """Leader path of the single-flight: fetch from CFBD and populate the cache."""
+    full_url = str(req.url)
+    lock_key = None
+    if r is not None and SINGLEFLIGHT_REDIS_LOCK:
+        try:
+            acquired = await r.set(_lock_key(cache_key), "1", nx=True, px=SINGLEFLIGHT_LOCK_TTL_MS)
+        except Exception as e:
+            _dbg(1, "CFBD single-flight lock error: %s", e)
+            acquired = True  # fail open: fetch ourselves
+        if acquired:
+            lock_key = _lock_key(cache_key)
+        else:
+            _dbg(1, "CFBD single-flight WAIT (peer worker): %s", cache_key)
+            cached = await _wait_for_peer(r, cache_key)
+            if cached:
+                _local_put(cache_key, full_url, cached)
+                return cached
+
+    try:
+        try:
+            raw_text = await _fetch_upstream(client, req, priority)
+        except httpx.HTTPStatusError as e:
+            if CACHE_NEGATIVE_TTL > 0 and e.response.status_code in NEGATIVE_STATUS:
+                _NEGATIVE_STATS["misses"] += 1
+                await _cache_set_negative(r, cache_key, full_url, e)
+            raise
+        try:
+            data = json.loads(raw_text)
+        except ValueError:
+            # A proxy or maintenance page served with 200: an upstream failure, never cached
+            raise httpx.DecodingError(f"CFBD returned a non-JSON body: {raw_text[:80]!r}", request=req)
+        payload = _new_payload(full_url, raw_text, data)
+        await _cache_set(r, cache_key, full_url, payload)
+        return payload
+    finally:
+        if lock_key is not None:
+            try:
+                await r.delete(lock_key)
+            except Exception as e:
+                _dbg(1, "CFBD single-flight unlock error: %s", e)
+
+def _forget_inflight(cache_key: str, task: asyncio.Task) -> None:
+    if _inflight.get(cache_key) is task:
+        del _inflight[cache_key]
+        _inflight_priority.pop(cache_key, None)
+    # Mark the exception as retrieved; every waiter re-raises it on its own
+    if not task.cancelled():
+        task.exception()
+
+def _start_fetch(client: httpx.AsyncClient, req: httpx.Request, r: redis.Redis | None,
+                 cache_key: str, priority: int = PRIORITY_INTERACTIVE) -> asyncio.Task:
+    """Return the in-flight fetch task for cache_key, starting one if needed."""
+    task = _inflight.get(cache_key)
+    if task is None:
+        handle = _inflight_priority[cache_key] = Priority(priority)
+        task = asyncio.create_task(_fetch_and_store(client, req, r, cache_key, handle))
+        _inflight[cache_key] = task
+        task.add_done_callback(lambda t: _forget_inflight(cache_key, t))
+    else:
+        _dbg(1, "CFBD single-flight JOIN: %s", cache_key)
+        # An interactive caller must not wait behind the background queue it joined
+        handle = _inflight_priority.get(cache_key)
+        if handle is not None:
+            handle.raise_to(priority)
+    return task
+
+async def _get_url_body(client: httpx.AsyncClient, req: httpx.Request,
+                        priority: int = PRIORITY_INTERACTIVE) -> Payload:
+    """Return the payload for a built CFBD request, from the local tier, Redis or upstream.
+
+    Identical concurrent misses (same canonical full URL) share one upstream call.
+    Soft-expired entries are served while a background task refreshes them.
+    """
+    full_url = str(req.url)
+    cache_key = _url_cache_key(full_url)
+    _, rule = _ttl_rule_for_url(full_url)
+
+    local = local_cache.get(cache_key)
+    if local is not None:
+        if local.status is not None:
+            return _raise_if_negative(req, local)
+        _dbg(1, "CFBD local cache HIT: %s", cache_key)
+        ttl_policy.record(rule, "hit")
+        return local
+
+    r = await _get_redis()
+    cached = await _cache_get(r, cache_key)
+    return await _resolve_url_body(client, req, r, cache_key, rule, cached, priority)
+
+async def _resolve_url_body(client: httpx.AsyncClient, req: httpx.Request, r: redis.Redis | None,
+                            cache_key: str, rule: str, cached: Payload | None,
+                            priority: int = PRIORITY_INTERACTIVE) -> Payload:
+    """Serve a Redis lookup result (fresh, stale, negative or missing), fetching upstream as needed."""
+    if cached is not None and cached.status is not None:
+        _local_put(cache_key, str(req.url), cached)
+        return _raise_if_negative(req, cached)
+    # A peer worker may have stored a negative entry while we waited on its lock
+    return _raise_if_negative(req, await _resolve_cached(client, req, r, cache_key, rule, cached, priority))
+
+async def _resolve_cached(client: httpx.AsyncClient, req: httpx.Request, r: redis.Redis | None,
+                          cache_key: str, rule: str, cached: Payload | None,
+                          priority: int = PRIORITY_INTERACTIVE) -> Payload:
+    full_url = str(req.url)
+    if cached:
+        if _is_fresh(cached.soft_expiry):
+            _dbg(1, "CFBD cache HIT: %s", cache_key)
+            ttl_policy.record(rule, "hit")
+            _local_put(cache_key, full_url, cached)
+            return cached
+        stale_for = time.time() - cached.soft_expiry
+        if stale_for <= CACHE_SWR_WINDOW:
+            _dbg(1, "CFBD cache STALE (%.0fs), refreshing in background: %s", stale_for, cache_key)
+            _SWR_STATS["stale_served"] += 1
+            ttl_policy.record(rule, "stale")
+            if cache_key not in _inflight:
+                _SWR_STATS["bg_refreshes"] += 1
+                _start_fetch(client, req, r, cache_key, PRIORITY_BACKGROUND)
+            return cached
+        # Too stale to serve blindly: only fall back to it if CFBD is failing
+        ttl_policy.record(rule, "miss")
+        try:
+            return await asyncio.shield(_start_fetch(client, req, r, cache_key, priority))
+        except Exception as e:
+            if not _upstream_is_erroring(e):
+                raise
+            _dbg(1, "CFBD error (%s), serving stale (%.0fs): %s", e, stale_for, cache_key)
+            _SWR_STATS["stale_if_error"] += 1
+            return cached
+
+    ttl_policy.record(rule, "miss")
+    # shield: one caller going away must not cancel the fetch for the others
+    return await asyncio.shield(_start_fetch(client, req, r, cache_key, priority))
+
+# -----------------------------
+# Team / conference name index
+# -----------------------------
+# Built from /teams and /conferences (cached like any other URL) and rebuilt
+# daily in the background. Until the first build finishes, names pass through.
+TEAM_INDEX_ENABLED = os.getenv("CFBD_TEAM_INDEX", "1").lower() in ("1", "true", "yes")
+TEAM_INDEX_REFRESH = int(os.getenv("CFBD_TEAM_INDEX_REFRESH", str(24 * 60 * 60)))
+TEAM_INDEX_RETRY = 5 * 60
+TEAM_FUZZY_MIN_SCORE = float(os.getenv("CFBD_TEAM_FUZZY_MIN_SCORE", "0.6"))
+TEAM_PARAMS = ("team", "home", "away", "offense", "defense")
+CONFERENCE_PARAMS = ("conference", "offense_conference", "defense_conference")
+
+team_index: TeamIndex | None = None
+_team_index_task: asyncio.Task | None = None
+
+async def _build_team_index(client: httpx.AsyncClient) -> TeamIndex:
+    teams = await _get_url_body(client, client.build_request("GET", "/teams"), PRIORITY_BACKGROUND)
+    conferences = await _get_url_body(client, client.build_request("GET", "/conferences"), PRIORITY_BACKGROUND)
+    return TeamIndex(teams.data, conferences.data, TEAM_FUZZY_MIN_SCORE)
+
+async def _team_index_loop(client: httpx.AsyncClient) -> None:
+    """Build the name index, then rebuild it every TEAM_INDEX_REFRESH seconds."""
+    global team_index
+    while True:
+        try:
+            team_index = await _build_team_index(client)
+            _dbg(1, "Team index built: %s", team_index.stats())
+            delay = TEAM_INDEX_REFRESH
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            _dbg(1, "Team index build failed (%s) — retrying in %ds", e, TEAM_INDEX_RETRY)
+            delay = TEAM_INDEX_RETRY
+        await asyncio.sleep(delay)
+
+def _start_team_index(client: httpx.AsyncClient) -> None:
+    global _team_index_task
+    if TEAM_INDEX_ENABLED and (_team_index_task is None or _team_index_task.done()):
+        _team_index_task = asyncio.create_task(_team_index_loop(client))
+
+def _resolve_names(params: dict) -> tuple[dict, list[str]]:
+    """Replace team/conference names CFBD would not recognize; return (params, notes)."""
+    index = team_index
+    if index is None:
+        return params, []
+    resolved = dict(params)
+    notes = []
+    for keys, resolve in ((TEAM_PARAMS, index.resolve_team), (CONFERENCE_PARAMS, index.resolve_conference)):
+        for key in keys:
+            value = params.get(key)
+            if not isinstance(value, str) or not value.strip():
+                continue
+            found, outcome = resolve(value)
+            if found is not None and outcome in ("alias", "fuzzy"):
+                resolved[key] = found
+                notes.append(f"{key} '{value}' → '{found}'" + (" (closest match)" if outcome == "fuzzy" else ""))
+    if notes:
+        _dbg(1, "Resolved names: %s", "; ".join(notes))
+    return resolved, notes
+
+# -----------------------------
+# Tool output rendering
+# -----------------------------
+# "json": compact JSON (default). CFBD already sends compact JSON, so an
+#         unmodified payload is passed through without a parse.
+# "repr": the Python repr of the parsed data, as older versions returned.
+OUTPUT_FORMAT = os.getenv("CFBD_OUTPUT_FORMAT", "json").lower()
+
+def render_data(data: Any) -> str:
+    """Render parsed data in the configured output format."""
+    if OUTPUT_FORMAT == "repr":
+        return str(data)
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+
+def render_payload(payload: Payload) -> str:
+    """Render a CFBD payload, passing the stored JSON text straight through when possible."""
+    if OUTPUT_FORMAT == "repr":
+        return str(payload.data)
+    return payload.text
+
+# -----------------------------
+# Result pagination
+# -----------------------------
+# Results over PAGE_MAX_BYTES (or over page_size records when the caller asks
+# for a page size) are snapshotted under an opaque cursor and served a page at
+# a time; follow-up pages never touch CFBD.
+PAGE_SIZE = int(os.getenv("CFBD_PAGE_SIZE", "500"))
+PAGE_MAX_BYTES = int(os.getenv("CFBD_PAGE_MAX_BYTES", str(200 * 1024)))
+MAX_PAGE_SIZE = 10000
+CURSOR_TTL = int(os.getenv("CFBD_CURSOR_TTL", str(30 * 60)))
+CURSOR_LOCAL_MAX_BYTES = int(os.getenv("CFBD_CURSOR_LOCAL_MAX_BYTES", str(256 * 1024 * 1024)))
+
+# Snapshots get their own budget so one large result cannot flush the URL cache;
+# each is held parsed and charged PARSED_SIZE_FACTOR times its rendered size, and
+# one snapshot may use at most a quarter of the budget
+snapshot_cache = LocalCache(CURSOR_LOCAL_MAX_BYTES)
+
+def _snapshot_key(snapshot_id: str) -> str:
+    return f"cfbd:cursor:{snapshot_id}"
+
+async def _store_snapshot(tool: str, items: list, text: str) -> str:
+    """Keep a full result for later pages: locally and, when available, in Redis.
+
+    Identical results share one snapshot; storing it again only renews its TTL.
+    """
+    snapshot_id = result_snapshot_id(tool, text)
+    key = _snapshot_key(snapshot_id)
+    snapshot_cache.set(key, (tool, items), len(text) * PARSED_SIZE_FACTOR, CURSOR_TTL)
+    r = await _get_redis()
+    if r is not None:
+        try:
+            if not await r.expire(key, CURSOR_TTL):
+                stored = json.dumps({"tool": tool, "items": items}, separators=(",", ":"), ensure_ascii=False)
+                await r.set(key, encode_body(stored, None, CACHE_CODEC, CACHE_COMPRESS_MIN_BYTES), ex=CURSOR_TTL)
+        except Exception as e:
+            _dbg(1, "Cursor snapshot store error: %s", e)
+    return snapshot_id
+
+async def _load_snapshot(snapshot_id: str) -> tuple[str, list] | None:
+    key = _snapshot_key(snapshot_id)
+    snapshot = snapshot_cache.get(key)
+    if snapshot is not None:
+        return snapshot
+    r = await _get_redis()
+    if r is None:
+        return None
+    try:
+        value = await r.get(key)
+        if not value:
+            return None
+        text, _ = decode_body(value)
+        stored = json.loads(text)
+    except Exception as e:
+        _dbg(1, "Cursor snapshot load error: %s", e)
+        return None
+    snapshot = (stored["tool"], stored["items"])
+    snapshot_cache.set(key, snapshot, len(text) * PARSED_SIZE_FACTOR, CURSOR_TTL)
+    return snapshot
+
+def _page_size_option(options: dict) -> int:
+    page_size = options.get("page_size", PAGE_SIZE)
+    if not isinstance(page_size, int) or isinstance(page_size, bool) or not 1 <= page_size <= MAX_PAGE_SIZE:
+        raise ValueError(f"page_size must be an integer between 1 and {MAX_PAGE_SIZE}")
+    return page_size
+
+def _render_page(tool: str, snapshot_id: str, items: list, offset: int, page_size: int) -> list[types.TextContent]:
+    """Render one page plus a note carrying the cursor for the next one."""
+    pieces, end = cut_page(items, offset, page_size, PAGE_MAX_BYTES, render_data)
+    separator = ", " if OUTPUT_FORMAT == "repr" else ","
+    text = "[" + separator.join(pieces) + "]"
+    if end < len(items):
+        cursor = encode_cursor(snapshot_id, end, page_size)
+        note = (f"Records {offset + 1}-{end} of {len(items)}. "
+                f"For the next page call {tool} again with cursor=\"{cursor}\".")
+    else:
+        note = f"Records {offset + 1}-{end} of {len(items)} (last page)."
+    return [types.TextContent(type="text", text=text), types.TextContent(type="text", text=note)]
+
+async def _next_page(tool: str, options: dict) -> list[types.TextContent]:
+    """Serve a page from a cursor snapshot without calling CFBD."""
+    try:
+        snapshot_id, offset, page_size = decode_cursor(options["cursor"])
+        if "page_size" in options:
+            page_size = _page_size_option(options)
+        elif not 1 <= page_size <= MAX_PAGE_SIZE:
+            raise CursorError("Invalid cursor")
+        snapshot = await _load_snapshot(snapshot_id)
+        if snapshot is None:
+            raise CursorError("Cursor has expired; repeat the original query")
+        snapshot_tool, items = snapshot
+        if snapshot_tool != tool:
+            raise CursorError(f"Cursor belongs to {snapshot_tool}, not {tool}")
+        if not 0 <= offset < len(items):
+            raise CursorError("Cursor is past the end of the result")
+    except ValueError as e:
+        return [types.TextContent(type="text", text=f"Cursor error: {str(e)}")]
+    return _render_page(tool, snapshot_id, items, offset, page_size)
+
+# -----------------------------
+# Catalogue (resources and tools)
+# -----------------------------
+# The resource list, resource texts and tool list never change while the process
+# runs, so they are built once and the same objects are served to every session.
+RESOURCES = [
+    types.Resource(
+        uri="schema://games",
+        name="Games endpoint schema",
+        description="Get game information with scores, teams and metadata",
+        mimeType="text/plain"
+    ),
+    types.Resource(
+        uri="schema://records",
+        name="Team records endpoint schema",
+        description="Get team season records",
+        mimeType="text/plain"
+    ),
+    types.Resource(
+        uri="schema://plays",
+        name="Plays endpoint",
+        description="Schema for the /plays endpoint",
+        mimeType="text/plain"
+    ),
+    types.Resource(
+        uri="schema://drives",
+        name="Drives endpoint",
+        description="Schema for the /drives endpoint",
+        mimeType="text/plain"
+    ),
+    types.Resource(
+        uri="schema://plays/stats",
+        name="Play/stats endpoint",
+        description="Schema for the /plays/stats endpoint",
+        mimeType="text/plain"
+    ),
+    types.Resource(
+        uri="schema://rankings",
+        name="Rankings endpoint",
+        description="Schema for the /rankings endpoint",
+        mimeType="text/plain"
+    ),
+    types.Resource(
+        uri="schema://roster",
+        name="Roster endpoint",
+        description="Schema for the /roster endpoint",
+        mimeType="text/plain"
+    ),
+    types.Resource(
+        uri="schema://coaches",
+        name="Coaches endpoint",
+        description="Schema for the /coaches endpoint",
+        mimeType="text/plain"
+    ),
+    types.Resource(
+        uri="schema://lines",
+        name="Lines endpoint",
+        description="Schema for the /lines endpoint",
+        mimeType="text/plain"
+    ),
+    types.Resource(
+        uri="schema://metrics/wp/pregame",
+        name="Metrics/wp/pregame endpoint",
+        description="Schema for the pregame win probability endpoint",
+        mimeType="text/plain"
+    ),
+    types.Resource(
+        uri="schema://game/box/advanced",
+        name="Advanced box score endpoint",
+        description="Schema for the advanced box score endpoint",
+        mimeType="text/plain"
+    ),
+    types.Resource(
+        uri="stats://upstream",
+        name="Upstream stats",
+        description="Rate limiter, cache and (over HTTP) event/token store counters and memory use",
+        mimeType="application/json"
+    )
+]
+
+# Map URIs to schema classes
+RESOURCE_SCHEMAS = {
+    "schema://games": {
+        "endpoint": "/games",
+        "parameters": getGames.__annotations__,
+        "response": GamesResponse.__annotations__,
+        "description": "Get game information for specified parameters"
+    },
+    "schema://records": {
+        "endpoint": "/records",
+        "parameters": getTeamRecords.__annotations__,
+        "response": TeamRecordResponse.__annotations__,
+        "description": "Get team records for specified parameters"
+    },
+    "schema://plays": {
+        "endpoint": "/plays",
+        "parameters": getPlays.__annotations__,
+        "response": PlaysResponse.__annotations__,
+        "description": "Get play records for specified parameters"
+    },
+    "schema://drives": {
+        "endpoint": "/drives",
+        "parameters": getDrives.__annotations__,
+        "response": DrivesResponse.__annotations__,
+        "description": "Get drive records for specified parameters"
+    },
+    "schema://plays/stats": {
+        "endpoint": "/plays/stats",
+        "parameters": getPlaysStats.__annotations__,
+        "response": PlaysStatsResponse.__annotations__,
+        "description": "Get play by play records for specified parameters"
+    },
+    "schema://rankings": {
+        "endpoint": "/rankings",
+        "parameters": getRankings.__annotations__,
+        "response": RankingsResponse.__annotations__,
+        "description": "Get rankings records for specified parameters"
+    },
+    "schema://roster": {
+        "endpoint": "/roster",
+        "parameters": getRoster.__annotations__,
+        "response": RosterResponse.__annotations__,
+        "description": "Get team roster information for specified parameters"
+    },
+    "schema://coaches": {
+        "endpoint": "/coaches",
+        "parameters": getCoaches.__annotations__,
+        "response": CoachesResponse.__annotations__,
+        "description": "Get coaches information for specified parameters"
+    },
+    "schema://lines": {
+        "endpoint": "/lines",
+        "parameters": getLines.__annotations__,
+        "response": BettingGame.__annotations__,
+        "description": "Get betting data lines for specified parameters"
+    },
+    "schema://metrics/wp/pregame": {
+        "endpoint": "/metrics/wp/pregame",
+        "parameters": getMetricsPregameWp.__annotations__,
+        "response": MetricsPregameWpResponse.__annotations__,
+        "description": "Get pregame win probability records for specified parameters"
+    },
+    "schema://game/box/advanced": {
+        "endpoint": "/game/box/advanced",
+        "parameters": getAdvancedBoxScore.__annotations__,
+        "response": AdvancedBoxScoreResponse.__annotations__,
+        "description": "Get advanced box score data"
     }
+}
 
-    if uri not in schema_map:
-        raise ValueError(f"Unknown schema URI: {uri}")
-    
-    schema_info = schema_map[uri]
+_resource_texts: dict[str, str] = {}
+
+def _schema_text(uri: str) -> str:
+    """Readable schema text for a schema:// resource, formatted on first use."""
+    schema_text = _resource_texts.get(uri)
+    if schema_text is not None:
+        return schema_text
+    schema_info = RESOURCE_SCHEMAS[uri]
     # Format the schema information into a readable string
     schema_text = f"""
 Endpoint: {schema_info['endpoint']}
@@ -323,13 +1026,51 @@ Response Schema:
 {_format_annotations(schema_info['response'])}
 
 Valid Values:
-- Seasons: {min(VALID_SEASONS)} to {max(VALID_SEASONS)}
+- Seasons: {min(valid_seasons())} to {max(valid_seasons())}
 - WEEKS: {min(VALID_WEEKS)} to {max(VALID_WEEKS)}
 - Season Types: {', '.join(VALID_SEASON_TYPES)}
 - Divisions: {', '.join(VALID_DIVISIONS)}
 """
+    _resource_texts[uri] = schema_text
     return schema_text
 
+@server.list_resources()
+async def handle_list_resources() -> list[types.Resource]:
+    """List available endpoint schemas as resources."""
+    return RESOURCES
+
+@server.read_resource()
+async def handle_read_resource(uri: str) -> str:
+    """Return the schema for the requested endpoint."""
+    uri = str(uri)
+    if uri == "stats://upstream":
+        return json.dumps(_upstream_stats(), indent=2)
+    if uri not in RESOURCE_SCHEMAS:
+        raise ValueError(f"Unknown schema URI: {uri}")
+    return _schema_text(uri)
+
+# Extra sections for stats://upstream from the hosting entry point (e.g. the event store)
+STATS_PROVIDERS: dict[str, Callable[[], dict]] = {}
+
+def _upstream_stats() -> dict:
+    """Counters exposed through the stats://upstream resource."""
+    return {
+        "rate_limiter": rate_limiter.stats(),
+        "retries": _RETRY_STATS["retries"],
+        "swr": dict(_SWR_STATS),
+        "negative_cache": dict(_NEGATIVE_STATS),
+        "local_cache": local_cache.stats(),
+        "ttl_rules": ttl_policy.stats(),
+        "cursor_snapshots": snapshot_cache.stats(),
+        "inflight": len(_inflight),
+        "team_index": team_index.stats() if team_index is not None else None,
+        "rejected_before_upstream": {
+            "total": sum(_REJECTED_STATS.values()),
+            "by_tool": dict(_REJECTED_STATS),
+        },
+        **{name: provider() for name, provider in STATS_PROVIDERS.items()},
+    }
+
 def _format_annotations(annotations: dict) -> str:
     """Helper function to format type annotations into readable text."""
     formatted = []
@@ -343,57 +1084,8 @@ def _format_annotations(annotations: dict) -> str:
     return "\n".join(formatted)
 
 def validate_params(params: dict, schema_class: Type[TypedDict]) -> dict:
-    """Validate parameters against a TypedDict schema."""
-    try:
-        # Get the annotations from the schema class
-        expected_types = schema_class.__annotations__
-        validated_params = {}
-
-        # Validate each parameter
-        for key, value in params.items():
-            if key not in expected_types:
-                raise ValueError(f"Unexpected parameter: {key}")
-
-            expected_type = expected_types[key]
-
-            # Special handling for classification parameter
-            if key == "classification" and value is not None:
-                value = value.lower()
-                if value not in VALID_DIVISIONS:
-                    raise ValueError(f"Invalid Classification: Must be one of: {', '.join(VALID_DIVISIONS)}")
-
-            # Handle Optional types
-            if hasattr(expected_type, "__origin__") and expected_type.__origin__ is Union:
-                if type(None) in expected_type.__args__:
-                    # Parameter is optional
-                    if value is not None:
-                        # Validate against the non-None type
-                        non_none_type = next(t for t in expected_type.__args__ if t != type(None))
-                        # Handle primitive types
-                        if non_none_type in (str, int, float, bool):
-                            if not isinstance(value, non_none_type):
-                                raise ValueError(f"Parameter {key} must be of type {non_none_type.__name__}")
-                        validated_params[key] = value
-                    else:
-                        validated_params[key] = None
-            else:
-                # Parameter is required
-                if not isinstance(value, expected_type):
-                    raise ValueError(f"Parameter {key} must be of type {expected_type.__name__}")
-                validated_params[key] = value
-
-        # Check for required parameters
-        for param, param_type in expected_types.items():
-            is_optional = (hasattr(param_type, "__origin__") and 
-                         param_type.__origin__ is Union and 
-                         type(None) in param_type.__args__)
-            if not is_optional and param not in params:
-                raise ValueError(f"Missing required parameter: {param}")
-
-        return validated_params
-    
-    except Exception as e:
-        raise ValueError(f"Parameter validation failed: {str(e)}")
+    """Validate parameters against a TypedDict schema (compiled once per schema)."""
+    return validator_for(schema_class)(params)
 
 @server.list_prompts()
 async def handle_list_prompts() -> list[types.Prompt]:
@@ -530,9 +1222,101 @@ async def handle_get_prompt(
     else:
         raise ValueError(f"Unknown prompt: {name}")
 
-@server.list_tools()
-async def handle_list_tools() -> list[types.Tool]:
-    """List available tools for querying the API."""
+# Arguments accepted by every data tool on top of its endpoint parameters.
+# They shape the result and are never sent to CFBD.
+OUTPUT_OPTIONS_SCHEMA = {
+    "fields": {
+        "type": "array",
+        "items": {"type": "string"},
+        "description": "Return only these response fields for each record; "
+                       "nested fields use dots, e.g. [\"offense\", \"down\", \"clock.minutes\"]",
+    },
+    "filter": {
+        "type": "string",
+        "description": "Keep only records matching an expression, e.g. "
+                       "'offense == \"Alabama\" and down == 3'. Operators: == != < <= > >= in, not in, and, or, not",
+    },
+    "group_by": {
+        "type": "array",
+        "items": {"type": "string"},
+        "description": "Group records by these fields (returns one row per group)",
+    },
+    "aggregate": {
+        "type": "array",
+        "items": {"type": "string"},
+        "description": "Aggregates per group: count, sum:<field>, mean:<field>, min:<field>, max:<field>, "
+                       "rate:<expression> (e.g. 'rate:yards_gained >= distance')",
+    },
+    "sort": {
+        "type": "array",
+        "items": {"type": "string"},
+        "description": "Sort by fields or aggregate names; prefix with - for descending",
+    },
+    "limit": {
+        "type": "integer",
+        "description": "Maximum number of records/rows to return",
+    },
+    "page_size": {
+        "type": "integer",
+        "description": "Records per page when a result is paginated",
+    },
+    "cursor": {
+        "type": "string",
+        "description": "Cursor from a previous paginated result; returns the next page (other arguments are ignored)",
+    },
+}
+
+# Response schema of each tool, used to validate `fields`
+TOOL_RESPONSE_TYPES = {
+    "get-games": GamesResponse,
+    "get-records": TeamRecordResponse,
+    "get-games-teams": GamesTeamsResponse,
+    "get-plays": PlaysResponse,
+    "get-drives": DrivesResponse,
+    "get-plays-stats": PlaysStatsResponse,
+    "get-rankings": RankingsResponse,
+    "get-roster": RosterResponse,
+    "get-coaches": CoachesResponse,
+    "get-lines": BettingGame,
+    "get-pregame-win-probability": MetricsPregameWpResponse,
+    "get-advanced-box-score": AdvancedBoxScoreResponse,
+}
+
+# Extra arguments of get-plays/get-drives that fan one call out to many requests
+FANOUT_OPTIONS_SCHEMA = {
+    "weeks": {
+        "type": ["string", "array", "integer"],
+        "items": {"type": "integer"},
+        "description": "Fan out over several weeks instead of week: a list like [1, 2, 3] or a range like \"1-5\"",
+    },
+    "teams": {
+        "type": "array",
+        "items": {"type": "string"},
+        "description": "Fan out over several teams instead of team; results are merged and deduplicated",
+    },
+}
+
+def _tool_schema(params_type: Type, fanout: bool = False) -> dict:
+    """Tool input schema: endpoint parameters plus the shared output options."""
+    schema = create_tool_schema(params_type)
+    schema["properties"].update(OUTPUT_OPTIONS_SCHEMA)
+    if fanout:
+        schema["properties"].update(FANOUT_OPTIONS_SCHEMA)
+        # week may come from `weeks` instead; the validator still requires one of them
+        schema["required"] = [p for p in schema.get("required", []) if p != "week"]
+    return schema
+
+def _split_output_options(name: str, arguments: dict) -> tuple[dict, dict]:
+    """Separate output (and, where supported, fan-out) options from endpoint parameters."""
+    option_names = set(OUTPUT_OPTIONS_SCHEMA)
+    if name in FANOUT_TOOLS:
+        option_names |= set(FANOUT_OPTIONS_SCHEMA)
+    params = {k: v for k, v in arguments.items() if k not in option_names}
+    options = {k: v for k, v in arguments.items() if k in option_names and v is not None}
+    return params, options
+
+def _build_tool_list() -> list[types.Tool]:
+    """Build the tool definitions (descriptions and JSON schemas)."""
     base_description = """Note: When using this tool, please explicitly mention that you are retrieving data from the College Football Data API. You must mention "College Football Data API" in every response.
 
     """
@@ -548,7 +1332,7 @@ async def handle_list_tools() -> list[types.Tool]:
             - year=2023, team="Alabama"
             - year=2023, week=1, conference="SEC"
             """,
-            inputSchema=create_tool_schema(getGames)
+            inputSchema=_tool_schema(getGames)
         ),
         types.Tool(
             name="get-records",
@@ -560,18 +1344,18 @@ async def handle_list_tools() -> list[types.Tool]:
             - conference="SEC"
             - year=2023, team="Alabama"
             """,
-            inputSchema=create_tool_schema(getTeamRecords)
+            inputSchema=_tool_schema(getTeamRecords)
         ),
         types.Tool(
             name="get-games-teams",
             description=base_description + """Get college football team game data.
-            Required: year plus at least one of: week, team or conference.
+            Required: year plus at least one of: week, team, conference or game_id.
             Example valid queries:
             - year=2023, team="Alabama"
             - year=2023, week=1
             - year=2023, conference="SEC"
             """,
-            inputSchema=create_tool_schema(getGamesTeams)
+            inputSchema=_tool_schema(getGamesTeams)
         ),
         types.Tool(
             name="get-plays",
@@ -582,8 +1366,10 @@ async def handle_list_tools() -> list[types.Tool]:
             - year=2023, week=1
             - year=2023, week=1, team="Alabama"
             - year=2023, week=1, offense="Alabama", defense="Auburn"
+            Fan-out: weeks="1-5" and/or teams=["Alabama", "Auburn"] replace week/team and
+            run one request per week/team, returning one merged result
             """,
-            inputSchema=create_tool_schema(getPlays)
+            inputSchema=_tool_schema(getPlays, fanout=True)
         ),
         types.Tool(
             name="get-drives",
@@ -594,8 +1380,10 @@ async def handle_list_tools() -> list[types.Tool]:
             - year=2023
             - year=2023, team="Alabama"
             - year=2023, offense="Alabama", defense="Auburn"
+            Fan-out: weeks="1-5" and/or teams=["Alabama", "Auburn"] replace week/team and
+            run one request per week/team, returning one merged result
             """,
-            inputSchema=create_tool_schema(getDrives)
+            inputSchema=_tool_schema(getDrives, fanout=True)
         ),
         types.Tool(
             name="get-plays-stats",
@@ -607,7 +1395,7 @@ async def handle_list_tools() -> list[types.Tool]:
             - game_id=401403910
             - team="Alabama", year=2023
             """,
-            inputSchema=create_tool_schema(getPlaysStats)
+            inputSchema=_tool_schema(getPlaysStats)
         ),
         types.Tool(
             name="get-rankings",
@@ -619,7 +1407,7 @@ async def handle_list_tools() -> list[types.Tool]:
             - year=2023, week=1
             - year=2023, season_type="regular"
             """,
-            inputSchema=create_tool_schema(getRankings)
+            inputSchema=_tool_schema(getRankings)
         ),
         types.Tool(
             name="get-roster",
@@ -630,7 +1418,7 @@ async def handle_list_tools() -> list[types.Tool]:
             - team="Alabama"
             - team="Alabama", year=2023
             """,
-            inputSchema=create_tool_schema(getRoster)
+            inputSchema=_tool_schema(getRoster)
         ),
         types.Tool(
             name="get-coaches",
@@ -643,7 +1431,7 @@ async def handle_list_tools() -> list[types.Tool]:
             - team="Alabama"
             - team="Alabama", year=2023
             """,
-            inputSchema=create_tool_schema(getCoaches)
+            inputSchema=_tool_schema(getCoaches)
         ),
         types.Tool(
             name="get-lines",
@@ -659,7 +1447,7 @@ async def handle_list_tools() -> list[types.Tool]:
             - year=2025, home="Penn State", away="Ohio State"
             - year=2025, conference="SEC"
             """,
-            inputSchema=create_tool_schema(getLines)
+            inputSchema=_tool_schema(getLines)
         ),
         types.Tool(
             name="get-pregame-win-probability",
@@ -671,7 +1459,7 @@ async def handle_list_tools() -> list[types.Tool]:
             - team="Alabama"
             - year=2023, week=1
             """,
-            inputSchema=create_tool_schema(getMetricsPregameWp)
+            inputSchema=_tool_schema(getMetricsPregameWp)
         ),
         types.Tool(
             name="get-advanced-box-score",
@@ -680,10 +1468,402 @@ async def handle_list_tools() -> list[types.Tool]:
             Example valid queries:
             - gameId=401403910
             """,
-            inputSchema=create_tool_schema(getAdvancedBoxScore)
+            inputSchema=_tool_schema(getAdvancedBoxScore)
+        ),
+        types.Tool(
+            name="batch",
+            description=base_description + f"""Run several of the tools above in one call.
+            Required: requests, a list of {{"tool": <tool name>, "arguments": {{...}}}} (at most {BATCH_MAX_ENTRIES})
+            All entries are validated before any data is fetched. Cached results are read in one
+            lookup and only the rest are requested from the API. Results come back as one JSON
+            object keyed by entry index, each with status "ok" (and data) or "error".
+            Example valid queries:
+            - requests=[{{"tool": "get-games", "arguments": {{"year": 2023, "team": "Alabama", "week": 1}}}},
+                        {{"tool": "get-lines", "arguments": {{"year": 2023, "team": "Alabama", "week": 1}}}}]
+            """,
+            inputSchema=BATCH_SCHEMA
         )
     ]
 
+_tool_list: list[types.Tool] | None = None
+_catalogue_version: str | None = None
+
+def tool_catalogue() -> list[types.Tool]:
+    """The tool list, built on first use and then shared by every session."""
+    global _tool_list
+    if _tool_list is None:
+        _tool_list = _build_tool_list()
+    return _tool_list
+
+def catalogue_version() -> str:
+    """Content hash of the tools and resources, usable as an ETag."""
+    global _catalogue_version
+    if _catalogue_version is None:
+        digest = hashlib.sha256()
+        for tool in tool_catalogue():
+            digest.update(tool.model_dump_json(exclude_none=True).encode("utf-8"))
+        for resource in RESOURCES:
+            digest.update(resource.model_dump_json(exclude_none=True).encode("utf-8"))
+        for uri in RESOURCE_SCHEMAS:
+            digest.update(_schema_text(uri).encode("utf-8"))
+        _catalogue_version = digest.hexdigest()[:16]
+    return _catalogue_version
+
+@server.list_tools()
+async def handle_list_tools() -> list[types.Tool]:
+    """List available tools for querying the API."""
+    return tool_catalogue()
+
+# Tool name -> request parameter schema and CFBD endpoint
+TOOL_PARAM_SCHEMAS = {
+    "get-games": getGames,
+    "get-records": getTeamRecords,
+    "get-games-teams": getGamesTeams,
+    "get-plays": getPlays,
+    "get-drives": getDrives,
+    "get-plays-stats": getPlaysStats,
+    "get-rankings": getRankings,
+    "get-roster": getRoster,
+    "get-coaches": getCoaches,
+    "get-lines": getLines,
+    "get-pregame-win-probability": getMetricsPregameWp,
+    "get-advanced-box-score": getAdvancedBoxScore
+}
+
+# Tool name -> precompiled parameter validator
+TOOL_VALIDATORS = compile_validators(TOOL_PARAM_SCHEMAS)
+
+# Calls rejected by local validation, i.e. never sent to CFBD
+_REJECTED_STATS: dict[str, int] = {}
+
+def _count_rejected(name: Any) -> None:
+    name = name if name in TOOL_PARAM_SCHEMAS else "other"
+    _REJECTED_STATS[name] = _REJECTED_STATS.get(name, 0) + 1
+
+TOOL_ENDPOINTS = {
+    "get-games": "/games",
+    "get-records": "/records",
+    "get-games-teams": "/games/teams",
+    "get-plays": "/plays",
+    "get-drives": "/drives",
+    "get-plays-stats": "/plays/stats",
+    "get-rankings": "/rankings",
+    "get-roster": "/roster",
+    "get-coaches": "/coaches",
+    "get-lines": "/lines",
+    "get-pregame-win-probability": "/metrics/wp/pregame",
+    "get-advanced-box-score": "/game/box/advanced"
+}
+
+def _api_error_text(e: Exception) -> str:
+    """User-facing message for an upstream failure."""
+    if isinstance(e, httpx.HTTPStatusError):
+        if e.response.status_code == 401:
+            return "401: API authentication failed. Please check your API key."
+        elif e.response.status_code == 403:
+            return "403: API access forbidden. Please check your permission."
+        elif e.response.status_code == 429:
+            return "429: Rate limit exceeded. Please try again later."
+        return f"API Error: {e}"
+    if isinstance(e, QuotaExhausted):
+        return f"Quota exhausted: {str(e)}"
+    if isinstance(e, httpx.DecodingError):
+        return f"API Error: {str(e)}"
+    return f"Network error: {str(e)}"
+
+def _compile_output_options(name: str, options: dict) -> tuple[int, Any, Any]:
+    """Check output options and return (page size, field tree, query) for a tool."""
+    page_size = _page_size_option(options)
+    field_tree = None
+    if "fields" in options:
+        if not isinstance(options["fields"], list):
+            raise ValueError("fields must be a list of field names")
+        field_tree = compile_fields(TOOL_RESPONSE_TYPES[name], options["fields"])
+    query = compile_query(options, TOOL_RESPONSE_TYPES[name])
+    if query is not None and query.aggregating and field_tree is not None:
+        raise ValueError("fields cannot be combined with group_by/aggregate")
+    return page_size, field_tree, query
+
+async def _render_result(name: str, options: dict, query, field_tree, page_size: int,
+                         payload: Payload | None = None, data: Any = None) -> list[types.TextContent]:
+    """Shape (query/fields), render and, if large, paginate a tool result.
+
+    Raises:
+        QueryError: if the query cannot be applied to the result
+    """
+    if query is not None or field_tree is not None:
+        # Shape the (possibly cached) full body; no refetch per query or field set
+        if payload is not None:
+            data = payload.data
+        if query is not None:
+            data = query.apply(data)
+        if field_tree is not None:
+            data = project(data, field_tree)
+        payload = None
+    text = render_payload(payload) if payload is not None else render_data(data)
+
+    # Paginate large list results; later pages are served from the snapshot
+    if len(text) > PAGE_MAX_BYTES or "page_size" in options:
+        if payload is not None:
+            data = payload.data
+        if isinstance(data, list) and (len(data) > page_size or len(text) > PAGE_MAX_BYTES):
+            snapshot_id = await _store_snapshot(name, data, text)
+            _dbg(1, "Paginated %s: %d records, %d chars (snapshot %s)", name, len(data), len(text), snapshot_id)
+            return _render_page(name, snapshot_id, data, 0, page_size)
+
+    return [types.TextContent(
+        type="text",
+        text=text
+    )]
+
+# -----------------------------
+# Fan-out (plays/drives over week ranges and team lists)
+# -----------------------------
+FANOUT_TOOLS = {"get-plays", "get-drives"}
+FANOUT_MAX_REQUESTS = int(os.getenv("CFBD_FANOUT_MAX_REQUESTS", "64"))
+FANOUT_CONCURRENCY = int(os.getenv("CFBD_FANOUT_CONCURRENCY", "4"))
+# Same bounds the per-request validators apply to `week`
+MIN_FANOUT_WEEK, MAX_FANOUT_WEEK = VALID_WEEKS.start, VALID_WEEKS.stop - 1
+
+def _parse_weeks(spec: Any) -> list[int]:
+    """Accept 5, [1, 2, 3] or "1-5,8" and return a sorted list of week numbers."""
+    weeks: set[int] = set()
+    items = spec if isinstance(spec, list) else [spec]
+    for item in items:
+        if isinstance(item, int) and not isinstance(item, bool):
+            weeks.add(item)
+            continue
+        if not isinstance(item, str):
+            raise ValueError("weeks must be a week number, a list of weeks or a range like '1-5'")
+        for part in item.split(","):
+            part = part.strip()
+            start, sep, end = part.partition("-")
+            try:
+                first, last = (int(start), int(end)) if sep else (int(part), int(part))
+            except ValueError:
+                raise ValueError(f"Invalid week range: '{part}'")
+            if not MIN_FANOUT_WEEK <= first <= last <= MAX_FANOUT_WEEK:
+                raise ValueError(f"weeks must be between {MIN_FANOUT_WEEK} and {MAX_FANOUT_WEEK}")
+            weeks.update(range(first, last + 1))
+    if not weeks or not all(MIN_FANOUT_WEEK <= w <= MAX_FANOUT_WEEK for w in weeks):
+        raise ValueError(f"weeks must be between {MIN_FANOUT_WEEK} and {MAX_FANOUT_WEEK}")
+    return sorted(weeks)
+
+def _expand_fanout(arguments: dict, options: dict) -> list[dict]:
+    """Expand weeks × teams into one parameter set per upstream request."""
+    weeks = _parse_weeks(options["weeks"]) if "weeks" in options else [arguments.get("week")]
+    teams = options.get("teams", [arguments.get("team")])
+    if isinstance(teams, str):
+        teams = [teams]
+    if not isinstance(teams, list) or not teams:
+        raise ValueError("teams must be a list of team names")
+    combos = []
+    for week in weeks:
+        for team in teams:
+            params = dict(arguments)
+            params.pop("week", None)
+            params.pop("team", None)
+            if week is not None:
+                params["week"] = week
+            if team is not None:
+                params["team"] = team
+            combos.append(params)
+    if len(combos) > FANOUT_MAX_REQUESTS:
+        raise ValueError(f"Fan-out of {len(combos)} requests exceeds the limit of {FANOUT_MAX_REQUESTS}")
+    return combos
+
+async def _fan_out(client: httpx.AsyncClient, name: str, sub_params: list[dict]) -> tuple[list, list[dict]]:
+    """Run sub-requests with bounded concurrency through the cache; merge and dedupe by id."""
+    semaphore = asyncio.Semaphore(FANOUT_CONCURRENCY)
+
+    async def one(params: dict):
+        async with semaphore:
+            req = client.build_request("GET", TOOL_ENDPOINTS[name], params=canonicalize_params(params))
+            try:
+                payload = await _get_url_body(client, req)
+                return params, payload.data, None
+            except (httpx.HTTPError, QuotaExhausted) as e:
+                return params, None, _api_error_text(e)
+
+    results = await asyncio.gather(*(one(p) for p in sub_params))
+    merged: list = []
+    seen: set = set()
+    summary: list[dict] = []
+    for params, data, error in results:
+        entry = {k: params[k] for k in ("week", "team") if k in params}
+        if error is not None:
+            entry.update(status="error", error=error)
+        else:
+            records = data if isinstance(data, list) else [data]
+            added = 0
+            for record in records:
+                record_id = record.get("id") if isinstance(record, dict) else None
+                if record_id is not None:
+                    if record_id in seen:
+                        continue
+                    seen.add(record_id)
+                merged.append(record)
+                added += 1
+            entry.update(status="ok", records=len(records), added=added)
+        summary.append(entry)
+    return merged, summary
+
+# -----------------------------
+# Batch (several tool calls in one invocation)
+# -----------------------------
+BATCH_MAX_ENTRIES = int(os.getenv("CFBD_BATCH_MAX_ENTRIES", "20"))
+# Options that need their own follow-up calls or requests are not allowed per entry
+BATCH_UNSUPPORTED_OPTIONS = ("cursor", "page_size", "weeks", "teams")
+
+BATCH_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "requests": {
+            "type": "array",
+            "minItems": 1,
+            "maxItems": BATCH_MAX_ENTRIES,
+            "items": {
+                "type": "object",
+                "properties": {
+                    "tool": {"type": "string", "enum": list(TOOL_PARAM_SCHEMAS)},
+                    "arguments": {
+                        "type": "object",
+                        "description": "Arguments exactly as for that tool, including fields/filter/aggregate",
+                    },
+                },
+                "required": ["tool", "arguments"],
+            },
+            "description": "Tool calls to run; results are returned keyed by their index in this list",
+        },
+    },
+    "required": ["requests"],
+}
+
+def _prepare_batch_entry(entry: Any) -> dict:
+    """Validate one batch entry as its tool would, without calling CFBD."""
+    if not isinstance(entry, dict) or not isinstance(entry.get("tool"), str):
+        raise ValueError("each entry needs a 'tool' name and an 'arguments' object")
+    name = entry["tool"]
+    if name not in TOOL_PARAM_SCHEMAS:
+        raise ValueError(f"Unknown tool: {name}")
+    arguments = entry.get("arguments") or {}
+    if not isinstance(arguments, dict):
+        raise ValueError("'arguments' must be an object")
+    unsupported = [k for k in BATCH_UNSUPPORTED_OPTIONS if k in arguments]
+    if unsupported:
+        raise ValueError(f"{', '.join(unsupported)} cannot be used inside batch; call {name} directly")
+    params, options = _split_output_options(name, arguments)
+    validated = TOOL_VALIDATORS[name](params)
+    page_size, field_tree, query = _compile_output_options(name, options)
+    return {"name": name, "params": validated, "options": options,
+            "page_size": page_size, "field_tree": field_tree, "query": query}
+
+async def _get_url_bodies(client: httpx.AsyncClient, reqs: list[httpx.Request]) -> list[Payload | BaseException]:
+    """Resolve many requests: local tier, one Redis MGET, then the misses concurrently.
+
+    Misses go through the usual single-flight and rate-limited path, so duplicates in
+    one batch share an upstream call and the limiter paces the rest.
+    """
+    results: list[Payload | BaseException | None] = [None] * len(reqs)
+    keys = [_url_cache_key(str(req.url)) for req in reqs]
+    rules = [_ttl_rule_for_url(str(req.url))[1] for req in reqs]
+
+    pending = []
+    for i, key in enumerate(keys):
+        local = local_cache.get(key)
+        if local is not None:
+            try:
+                results[i] = _raise_if_negative(reqs[i], local)
+            except httpx.HTTPStatusError as e:
+                results[i] = e
+                continue
+            ttl_policy.record(rules[i], "hit")
+        else:
+            pending.append(i)
+
+    r = await _get_redis()
+    cached = await _cache_get_many(r, [keys[i] for i in pending])
+    _dbg(1, "CFBD batch: %d requests, %d local hits, %d looked up in Redis",
+         len(reqs), len(reqs) - len(pending), len(pending) if r is not None else 0)
+
+    fetched = await asyncio.gather(
+        *(_resolve_url_body(client, reqs[i], r, keys[i], rules[i], payload)
+          for i, payload in zip(pending, cached)),
+        return_exceptions=True,
+    )
+    for i, result in zip(pending, fetched):
+        results[i] = result
+    return results
+
+async def _run_batch(arguments: dict) -> list[types.TextContent]:
+    """Run several tool calls at once and return one JSON object keyed by entry index."""
+    entries = arguments.get("requests")
+    if not isinstance(entries, list) or not entries:
+        return [types.TextContent(type="text", text="Validation error: requests must be a non-empty list")]
+    if len(entries) > BATCH_MAX_ENTRIES:
+        return [types.TextContent(
+            type="text",
+            text=f"Validation error: batch of {len(entries)} exceeds the limit of {BATCH_MAX_ENTRIES}"
+        )]
+
+    # Validate everything before any request is made
+    prepared = []
+    errors = []
+    for i, entry in enumerate(entries):
+        try:
+            prepared.append(_prepare_batch_entry(entry))
+        except ValueError as e:
+            errors.append(f"[{i}] {str(e)}")
+            _count_rejected(entry.get("tool") if isinstance(entry, dict) else None)
+    if errors:
+        return [types.TextContent(type="text", text="Validation error:\n" + "\n".join(errors))]
+
+    client = await open_api_client()
+    start = time.monotonic()
+    reqs = []
+    name_notes = []
+    for p in prepared:
+        resolved, notes = _resolve_names(p["params"])
+        reqs.append(client.build_request("GET", TOOL_ENDPOINTS[p["name"]], params=canonicalize_params(resolved)))
+        name_notes.append(notes)
+    bodies = await _get_url_bodies(client, reqs)
+
+    parts = []
+    failed = 0
+    for i, (p, body) in enumerate(zip(prepared, bodies)):
+        entry = {"tool": p["name"]}
+        if name_notes[i]:
+            entry["resolved_names"] = name_notes[i]
+        data_text = None
+        if isinstance(body, (httpx.HTTPStatusError, httpx.RequestError, QuotaExhausted)):
+            entry.update(status="error", error=_api_error_text(body))
+        elif isinstance(body, BaseException):
+            raise body
+        else:
+            try:
+                contents = await _render_result(p["name"], p["options"], p["query"], p["field_tree"],
+                                                p["page_size"], payload=body)
+            except QueryError as e:
+                entry.update(status="error", error=f"Query error: {str(e)}")
+            else:
+                entry["status"] = "ok"
+                if len(contents) > 1:  # paginated: first page plus the cursor note
+                    entry["note"] = contents[1].text
+                data_text = contents[0].text
+        if entry["status"] != "ok":
+            failed += 1
+        text = json.dumps(entry, separators=(",", ":"), ensure_ascii=False)
+        if data_text is not None:
+            if OUTPUT_FORMAT != "json":
+                data_text = json.dumps(data_text, ensure_ascii=False)
+            # Splice the rendered body in as-is rather than re-serializing it
+            text = text[:-1] + ',"data":' + data_text + "}"
+        parts.append(f'"{i}":{text}')
+
+    elapsed_ms = (time.monotonic() - start) * 1000
+    _dbg(1, "← batch of %d in %.1fms (%d failed)", len(prepared), elapsed_ms, failed)
+    return [types.TextContent(type="text", text="{" + ",".join(parts) + "}")]
+
 @server.call_tool()
 async def handle_call_tool(
     name: str,
@@ -693,145 +1873,101 @@ async def handle_call_tool(
     if not arguments:
         raise ValueError("Arguments are required")
 
+    if name == "batch":
+        return await _run_batch(arguments)
+
     # Map tool names to their parameter schemas
-    schema_map = {
-        "get-games": getGames,
-        "get-records": getTeamRecords,
-        "get-games-teams": getGamesTeams,
-        "get-plays": getPlays,
-        "get-drives": getDrives,
-        "get-plays-stats": getPlaysStats,
-        "get-rankings": getRankings,
-        "get-roster": getRoster,
-        "get-coaches": getCoaches,
-        "get-lines": getLines,
-        "get-pregame-win-probability": getMetricsPregameWp,
-        "get-advanced-box-score": getAdvancedBoxScore
-    }
+    schema_map = TOOL_PARAM_SCHEMAS
 
     if name not in schema_map:
         raise ValueError(f"Unknown tool: {name}")
 
+    arguments, options = _split_output_options(name, arguments)
+    if "cursor" in options:
+        return await _next_page(name, options)
+
     # Validate parameters against schema
     try:
-        validated_params = validate_params(arguments, schema_map[name])
+        fanout = None
+        if "weeks" in options or "teams" in options:
+            fanout, name_notes = [], []
+            for sub_params in _expand_fanout(arguments, options):
+                resolved, notes = _resolve_names(TOOL_VALIDATORS[name](sub_params))
+                fanout.append(resolved)
+                name_notes.extend(note for note in notes if note not in name_notes)
+        else:
+            validated_params, name_notes = _resolve_names(TOOL_VALIDATORS[name](arguments))
+        page_size, field_tree, query = _compile_output_options(name, options)
     except ValueError as e:
+        _count_rejected(name)
         return [types.TextContent(
             type="text",
             text=f"Validation error: {str(e)}"
         )]
 
-    endpoint_map = {
-        "get-games": "/games",
-        "get-records": "/records",
-        "get-games-teams": "/games/teams",
-        "get-plays": "/plays",
-        "get-drives": "/drives",
-        "get-plays-stats": "/plays/stats",
-        "get-rankings": "/rankings",
-        "get-roster": "/roster",
-        "get-coaches": "/coaches",
-        "get-lines": "/lines",
-        "get-pregame-win-probability": "/metrics/wp/pregame",
-        "get-advanced-box-score": "/game/box/advanced"
-    }
-   
-    async with await get_api_client() as client:
-        try:
-            start = time.monotonic()
-            method = "GET"
-            url = endpoint_map[name]
-            endpoint_path = endpoint_map[name]
+    endpoint_map = TOOL_ENDPOINTS
 
-            # log request
-            _dbg(1, "→ %s %s params=%s", method, endpoint_path, validated_params if DEBUG_LEVEL >= 2 else "{...}")
-            if DEBUG_LEVEL >= 2:
-                _dbg(2, "Request headers: %s", dict(client.headers))
-                if method == "POST":
-                    _dbg(2, "Request body: %s", arguments)
-
-            # Build canonical request to get exact full URL (sorted/encoded)
-            req = client.build_request(method, endpoint_path, params=validated_params)
-            full_url = str(req.url)
-
-            # -----------------------------
-            # Cache lookup by FULL URL (hashed)
-            # -----------------------------
-            r = await _get_redis()
-            cache_key = _url_cache_key(full_url)
-            if r is not None:
-                try:
-                    cached_text = await r.get(cache_key)
-                    if cached_text:
-                        _dbg(1, "CFBD cache HIT: %s", cache_key)
-                        data = json.loads(cached_text)
-                        elapsed_ms = (time.monotonic() - start) * 1000
-                        _dbg(1, "← %s %s %d in %.1fms (cache)", method, full_url, 200, elapsed_ms)
-                        return [types.TextContent(type="text", text=str(data))]
-                except Exception as e:
-                    _dbg(1, "CFBD cache get error: %s", e)
-
-            # Cache miss → call API
-            _dbg(1, "→ CFBD %s %s", method, full_url)
-            response = await client.send(req)
+    client = await open_api_client()
+    try:
+        start = time.monotonic()
+        method = "GET"
+        endpoint_path = endpoint_map[name]
+
+        if fanout is not None:
+            _dbg(1, "→ %s %s fan-out of %d requests", method, endpoint_path, len(fanout))
+            merged, summary = await _fan_out(client, name, fanout)
+            failed = sum(1 for entry in summary if entry["status"] != "ok")
+            summary_info = {
+                "requests": len(summary),
+                "ok": len(summary) - failed,
+                "failed": failed,
+                "unique_records": len(merged),
+                "sub_requests": summary,
+            }
+            if name_notes:
+                summary_info["resolved_names"] = name_notes
+            summary_text = "Fan-out summary: " + json.dumps(summary_info, separators=(",", ":"), ensure_ascii=False)
+            if failed == len(summary):
+                return [types.TextContent(type="text", text=summary_text)]
+            contents = await _render_result(name, options, query, field_tree, page_size, data=merged)
             elapsed_ms = (time.monotonic() - start) * 1000
+            _dbg(1, "← %s %s fan-out in %.1fms (%d failed)", method, endpoint_path, elapsed_ms, failed)
+            return contents + [types.TextContent(type="text", text=summary_text)]
 
-            # log response
-            _dbg(1, "← %s %s %d in %.1fms", method, full_url, response.status_code, elapsed_ms)
-            if DEBUG_LEVEL >= 2:
-                _dbg(2, "Response headers: %s", dict(response.headers))
+        # log request
+        _dbg(1, "→ %s %s params=%s", method, endpoint_path, validated_params if DEBUG_LEVEL >= 2 else "{...}")
+        if DEBUG_LEVEL >= 2:
+            _dbg(2, "Request headers: %s", dict(client.headers))
+            if method == "POST":
+                _dbg(2, "Request body: %s", arguments)
 
-            response.raise_for_status()
-            raw_text = response.text
-            data = json.loads(raw_text)
+        # Build canonical request to get exact full URL (sorted/encoded)
+        req = client.build_request(method, endpoint_path, params=canonicalize_params(validated_params))
+        full_url = str(req.url)
 
-            # -----------------------------
-            # Cache store by FULL URL (hashed)
-            # -----------------------------
-            if r is not None:
-                try:
-                    ttl = _ttl_for_endpoint_path(full_url)
-                    await r.set(cache_key, raw_text, ex=ttl)
-                    endpoint_path = _endpoint_path_from_url(full_url)
-                    _dbg(1, "CFBD cache SET: %s (%s, ttl=%ds)", cache_key, endpoint_path, ttl)
-                except Exception as e:
-                    _dbg(1, "CFBD cache set error: %s", e)
-
-            # For POSTs at level 1, also log request/response body
-            if DEBUG_LEVEL >= 1 and method == "POST":
-                _dbg(1, "POST body: %s", arguments)
-                _dbg(1, "POST reply: %s", _trim(str(data)))
-
-            return [types.TextContent(
-                type="text",
-                text=str(data)
-            )]
-        except httpx.HTTPStatusError as e:
-            if e.response.status_code == 401:
-                return [types.TextContent(
-                    type="text",
-                    text="401: API authentication failed. Please check your API key."
-                )]
-            elif e.response.status_code == 403:
-                return [types.TextContent(
-                    type="text",
-                    text="403: API access forbidden. Please check your permission."
-                )]
-            elif e.response.status_code == 429:
-                return [types.TextContent(
-                    type="text",
-                    text="429: Rate limit exceeded. Please try again later."
-                )]
-            else:
-                return [types.TextContent(
-                    type="text",
-                    text=f"API Error: {e}"
-                )]
-        except httpx.RequestError as e:
-            return [types.TextContent(
-                type="text",
-                text=f"Network error: {str(e)}"
-            )]
+        payload = await _get_url_body(client, req)
+        contents = await _render_result(name, options, query, field_tree, page_size, payload=payload)
+        if name_notes:
+            contents.append(types.TextContent(type="text", text="Resolved names: " + "; ".join(name_notes)))
+
+        # For POSTs at level 1, also log request/response body
+        if DEBUG_LEVEL >= 1 and method == "POST":
+            _dbg(1, "POST body: %s", arguments)
+            _dbg(1, "POST reply: %s", _trim(contents[0].text))
+
+        elapsed_ms = (time.monotonic() - start) * 1000
+        _dbg(1, "← %s %s in %.1fms", method, full_url, elapsed_ms)
+        return contents
+    except QueryError as e:
+        return [types.TextContent(
+            type="text",
+            text=f"Query error: {str(e)}"
+        )]
+    except (httpx.HTTPStatusError, httpx.RequestError, QuotaExhausted) as e:
+        return [types.TextContent(
+            type="text",
+            text=_api_error_text(e)
+        )]
 
 async def main() -> None:
     """Run the server."""
@@ -848,21 +1984,25 @@ async def main() -> None:
     
     # Add this line for startup confirmation
     print("CFB Data MCP Server starting...", file=sys.stderr)
-    
-    async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
-        print("Server initialized and ready for connections", file=sys.stderr)
-        await server.run(
-            read_stream,
-            write_stream,
-            InitializationOptions(
-                server_name=server_name,
-                server_version=server_version,
-                capabilities=server.get_capabilities(
-                    notification_options=NotificationOptions(),
-                    experimental_capabilities={},
+
+    await open_api_client()
+    try:
+        async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
+            print("Server initialized and ready for connections", file=sys.stderr)
+            await server.run(
+                read_stream,
+                write_stream,
+                InitializationOptions(
+                    server_name=server_name,
+                    server_version=server_version,
+                    capabilities=server.get_capabilities(
+                        notification_options=NotificationOptions(),
+                        experimental_capabilities={},
+                    ),
                 ),
-            ),
-        )
+            )
+    finally:
+        await close_api_client()
 
 if __name__ == "__main__":
     asyncio.run(main())
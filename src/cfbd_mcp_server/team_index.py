@@ -0,0 +1,216 @@
+"""
+Team and conference name index built from CFBD /teams and /conferences.
+
+Models often write team names CFBD does not recognize ("Penn St", "Mississippi
+State Bulldogs", "Pitt"); the API then answers with an empty list. Names are
+resolved before the request is built:
+
+1. exact alias lookup (dict): school name, CFBD alternate names, abbreviation,
+   "school mascot" and, where unique, the mascot alone; then the same with
+   common abbreviations expanded ("St" -> "State")
+2. fuzzy lookup: character trigram index over school and alternate names,
+   scored with the Dice coefficient; the best candidate must clear a minimum
+   score and beat the runner-up by a margin
+
+Aliases that point at more than one school at the same priority are dropped
+rather than guessed.
+"""
+
+import re
+import time
+from collections import defaultdict
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+# Tried only when the name as written has no exact match
+EXPANSIONS = {
+    "st": "state",
+    "univ": "university",
+    "u": "university",
+    "so": "southern",
+    "n": "north",
+    "s": "south",
+    "e": "east",
+    "w": "west",
+    "c": "central",
+    "mich": "michigan",
+    "miss": "mississippi",
+    "tenn": "tennessee",
+    "ga": "georgia",
+    "fla": "florida",
+    "ky": "kentucky",
+    "la": "louisiana",
+    "tex": "texas",
+    "ala": "alabama",
+    "ariz": "arizona",
+    "ark": "arkansas",
+    "caro": "carolina",
+    "car": "carolina",
+}
+
+# Alias priorities: lower wins when two schools share an alias
+_SCHOOL, _ALTERNATE, _FULL_NAME, _MASCOT = 0, 1, 2, 3
+
+# A fuzzy match must beat the next-best school by this much
+FUZZY_MARGIN = 0.05
+
+
+def normalize(name: str) -> str:
+    """Lowercase, '&' -> 'and', punctuation to spaces, collapsed whitespace."""
+    name = name.lower().replace("&", " and ")
+    return " ".join(_NON_ALNUM.sub(" ", name).split())
+
+
+def _expand(normalized: str) -> str:
+    return " ".join(EXPANSIONS.get(word, word) for word in normalized.split())
+
+
+def _trigrams(normalized: str) -> set[str]:
+    padded = f"  {normalized} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class _NameTable:
+    """
+    Exact aliases plus a trigram index for one kind of name (teams or conferences).
+    """
+
+    def __init__(self):
+        self._candidates: dict[str, dict[str, int]] = defaultdict(dict)  # alias -> {canonical: priority}
+        self.aliases: dict[str, str] = {}
+        self.names: list[tuple[str, set[str]]] = []  # (canonical, trigrams) for fuzzy matching
+        self.postings: dict[str, list[int]] = defaultdict(list)
+
+    def add_alias(self, alias: str | None, canonical: str, priority: int) -> None:
+        if not alias:
+            return
+        key = normalize(alias)
+        if not key:
+            return
+        current = self._candidates[key].get(canonical)
+        if current is None or priority < current:
+            self._candidates[key][canonical] = priority
+
+    def add_fuzzy(self, name: str | None, canonical: str) -> None:
+        if not name:
+            return
+        grams = _trigrams(normalize(name))
+        slot = len(self.names)
+        self.names.append((canonical, grams))
+        for gram in grams:
+            self.postings[gram].append(slot)
+
+    def freeze(self) -> None:
+        """Resolve alias conflicts: keep the best priority, drop ties between schools."""
+        for key, candidates in self._candidates.items():
+            best = min(candidates.values())
+            winners = [name for name, priority in candidates.items() if priority == best]
+            if len(winners) == 1:
+                self.aliases[key] = winners[0]
+        expanded: dict[str, set[str]] = defaultdict(set)
+        for key, canonical in self.aliases.items():
+            longer = _expand(key)
+            if longer != key and longer not in self.aliases:
+                expanded[longer].add(canonical)
+        for key, schools in expanded.items():
+            if len(schools) == 1:
+                self.aliases[key] = next(iter(schools))
+        self._candidates.clear()
+
+    def exact(self, name: str) -> str | None:
+        key = normalize(name)
+        found = self.aliases.get(key)
+        if found is None:
+            found = self.aliases.get(_expand(key))
+        return found
+
+    def fuzzy(self, name: str, min_score: float) -> tuple[str | None, float]:
+        grams = _trigrams(_expand(normalize(name)))
+        shared: dict[int, int] = defaultdict(int)
+        for gram in grams:
+            for slot in self.postings.get(gram, ()):
+                shared[slot] += 1
+        scores: dict[str, float] = {}
+        for slot, count in shared.items():
+            canonical, slot_grams = self.names[slot]
+            score = 2 * count / (len(grams) + len(slot_grams))
+            if score > scores.get(canonical, 0.0):
+                scores[canonical] = score
+        if not scores:
+            return None, 0.0
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        best, score = ranked[0]
+        if score < min_score or (len(ranked) > 1 and score - ranked[1][1] < FUZZY_MARGIN):
+            return None, score
+        return best, score
+
+
+class TeamIndex:
+    """
+    Resolves team and conference names to the spelling CFBD expects.
+    """
+
+    def __init__(self, teams: list[dict], conferences: list[dict], min_score: float = 0.6):
+        self.min_score = min_score
+        self.built_at = time.time()
+        self.outcomes: dict[str, int] = defaultdict(int)
+
+        self.teams = _NameTable()
+        mascot_schools: dict[str, set[str]] = defaultdict(set)
+        for team in teams:
+            school = team.get("school")
+            if not school:
+                continue
+            self.teams.add_alias(school, school, _SCHOOL)
+            self.teams.add_fuzzy(school, school)
+            for alternate in team.get("alternateNames") or team.get("alternate_names") or []:
+                self.teams.add_alias(alternate, school, _ALTERNATE)
+                self.teams.add_fuzzy(alternate, school)
+            self.teams.add_alias(team.get("abbreviation"), school, _ALTERNATE)
+            mascot = team.get("mascot")
+            if mascot:
+                self.teams.add_alias(f"{school} {mascot}", school, _FULL_NAME)
+                mascot_schools[normalize(mascot)].add(school)
+        for mascot, schools in mascot_schools.items():
+            if len(schools) == 1:
+                self.teams.add_alias(mascot, next(iter(schools)), _MASCOT)
+        self.teams.freeze()
+
+        self.conferences = _NameTable()
+        for conference in conferences:
+            canonical = conference.get("abbreviation") or conference.get("name")
+            if not canonical:
+                continue
+            for alias in (conference.get("abbreviation"), conference.get("name"),
+                          conference.get("shortName") or conference.get("short_name")):
+                self.conferences.add_alias(alias, canonical, _SCHOOL)
+                self.conferences.add_fuzzy(alias, canonical)
+        self.conferences.freeze()
+
+    def _resolve(self, table: _NameTable, name: str) -> tuple[str | None, str]:
+        found = table.exact(name)
+        if found is not None:
+            outcome = "exact" if normalize(found) == normalize(name) else "alias"
+        elif len(normalize(name)) >= 4:
+            found, _ = table.fuzzy(name, self.min_score)
+            outcome = "fuzzy" if found is not None else "unresolved"
+        else:
+            outcome = "unresolved"
+        self.outcomes[outcome] += 1
+        return found, outcome
+
+    def resolve_team(self, name: str) -> tuple[str | None, str]:
+        """Return (CFBD school name or None, "exact" | "alias" | "fuzzy" | "unresolved")."""
+        return self._resolve(self.teams, name)
+
+    def resolve_conference(self, name: str) -> tuple[str | None, str]:
+        """Return (CFBD conference abbreviation or None, outcome) like resolve_team."""
+        return self._resolve(self.conferences, name)
+
+    def stats(self) -> dict:
+        return {
+            "team_aliases": len(self.teams.aliases),
+            "conference_aliases": len(self.conferences.aliases),
+            "age_s": round(time.time() - self.built_at),
+            **dict(self.outcomes),
+        }
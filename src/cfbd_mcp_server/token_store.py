@@ -0,0 +1,430 @@
+"""
+Stores for the OAuth authorization codes and access tokens issued by the
+HTTP server.
+
+FileTokenStore keeps tokens in memory and appends each new one to a local
+log, one JSON object per line:
+
+    {"t": "<token>", "exp": <expiry epoch, 0 = never>}
+
+Once the log holds more than twice as many lines as live tokens it is
+rewritten with only the live ones (compaction). All file I/O runs in a worker
+thread, never on the event loop. Workers sharing the file see each other's
+tokens: an unknown token triggers a read of the lines appended since the last
+read, and appends and compaction take a lock file so none are lost. The JSON
+list written by earlier versions is converted on load.
+
+RedisTokenStore keeps one key per token that expires with the token, shared
+by every worker using the same Redis.
+
+Authorization codes live for minutes and are single-use: AuthCodeStore
+holds at most `max_codes` of them in memory, and RedisAuthCodeStore lets
+/authorize and /token land on different workers.
+"""
+
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+import redis.asyncio as redis
+
+try:
+    import fcntl
+except ImportError:  # not on Windows; appends there are not coordinated across processes
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+DAY = 86400
+
+
+class TokenStore(ABC):
+    """
+    Issued-token store interface used by anthropic_server.
+    """
+
+    def __init__(self, ttl: int = 30 * DAY):
+        self.ttl = ttl
+        self.counters = {"issued": 0, "accepted": 0, "rejected": 0, "expired": 0}
+
+    def _expiry(self) -> float:
+        return time.time() + self.ttl if self.ttl > 0 else 0.0
+
+    async def load(self) -> None:
+        """Read existing tokens; called once at startup."""
+
+    @abstractmethod
+    async def add(self, token: str) -> None:
+        """Record a newly issued token."""
+
+    @abstractmethod
+    async def contains(self, token: str) -> bool:
+        """Return whether the token was issued and has not expired."""
+
+    def stats(self) -> dict:
+        return dict(self.counters)
+
+    async def close(self) -> None:
+        pass
+
+
+def _parse_log(data: bytes, legacy_expiry: float) -> tuple[list[tuple[str, float]], int, bool]:
+    """Return (token records, bytes consumed, whether this is the legacy JSON list)."""
+    if data.lstrip().startswith(b"["):
+        try:
+            tokens = json.loads(data)
+        except ValueError as e:
+            logger.error(f"Failed to load issued tokens: {e}")
+            tokens = []
+        return [(token, legacy_expiry) for token in tokens], len(data), True
+    end = data.rfind(b"\n") + 1  # a line still being written is read next time
+    records = []
+    for line in data[:end].splitlines():
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+            records.append((str(record["t"]), float(record.get("exp") or 0)))
+        except (ValueError, KeyError, TypeError):
+            logger.warning(f"Skipping malformed token log line: {line[:40]!r}")
+    return records, end, False
+
+
+class FileTokenStore(TokenStore):
+    """
+    Tokens in memory, persisted to an append-only local log.
+    """
+
+    COMPACT_MIN_LINES = 1000
+
+    def __init__(self, path: str, ttl: int = 30 * DAY):
+        """Initialize the token store.
+
+        Args:
+            path: Log file; "<path>.lock" is used to coordinate workers
+            ttl: Seconds a token stays valid, 0 = never expires
+        """
+        super().__init__(ttl)
+        self.path = path
+        self.lock_path = f"{path}.lock"
+        self.tokens: dict[str, float] = {}  # token -> expiry (0 = never)
+        self.counters.update({"compactions": 0, "log_reads": 0})
+        self._inode: int | None = None
+        self._offset = 0  # bytes of the log already read
+        self._lines = 0  # lines in the log, for the compaction trigger
+        self._lock = asyncio.Lock()
+
+    @contextlib.contextmanager
+    def _file_lock(self):
+        if fcntl is None:
+            yield
+            return
+        with open(self.lock_path, "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    # Blocking helpers below run in a worker thread
+
+    def _read_log(self, inode: int | None, offset: int):
+        """Read records appended since `offset`, or the whole log if it was replaced."""
+        try:
+            f = open(self.path, "rb")
+        except FileNotFoundError:
+            return [], None, 0, True, False
+        with f:
+            stat = os.fstat(f.fileno())
+            full = stat.st_ino != inode or stat.st_size < offset
+            if full:
+                offset = 0
+            f.seek(offset)
+            data = f.read()
+        records, consumed, legacy = _parse_log(data, self._expiry())
+        return records, stat.st_ino, offset + consumed, full, legacy
+
+    def _append(self, line: bytes) -> tuple[int, int]:
+        """Append one line; return (inode, file size before the append)."""
+        with self._file_lock():
+            with open(self.path, "ab") as f:
+                start = f.tell()
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+                return os.fstat(f.fileno()).st_ino, start
+
+    def _rewrite(self, known: dict[str, float]) -> tuple[dict[str, float], int, int]:
+        """Merge the log with `known`, drop expired tokens, and replace the log atomically."""
+        with self._file_lock():
+            try:
+                with open(self.path, "rb") as f:
+                    records, _, _ = _parse_log(f.read(), self._expiry())
+            except FileNotFoundError:
+                records = []
+            now = time.time()
+            live = {token: exp for token, exp in records}
+            live.update(known)
+            live = {token: exp for token, exp in live.items() if not exp or exp > now}
+            tmp = f"{self.path}.tmp"
+            with open(tmp, "wb") as f:
+                for token, exp in live.items():
+                    f.write(json.dumps({"t": token, "exp": round(exp)}).encode("utf-8") + b"\n")
+                f.flush()
+                os.fsync(f.fileno())
+                size = f.tell()
+            os.replace(tmp, self.path)
+            return live, os.stat(self.path).st_ino, size
+
+    # Event-loop side
+
+    async def _refresh(self) -> bool:
+        """Pick up lines appended by other workers; return whether the log was in the legacy format."""
+        records, inode, offset, full, legacy = await asyncio.to_thread(self._read_log, self._inode, self._offset)
+        self.counters["log_reads"] += 1
+        if full:
+            self.tokens = {}
+            self._lines = 0
+        now = time.time()
+        for token, exp in records:
+            if not exp or exp > now:
+                self.tokens[token] = exp
+        self._lines += len(records)
+        self._inode, self._offset = inode, offset
+        return legacy
+
+    def _needs_compaction(self) -> bool:
+        if self._lines < self.COMPACT_MIN_LINES:
+            return False
+        now = time.time()
+        expired = [token for token, exp in self.tokens.items() if exp and exp <= now]
+        for token in expired:
+            del self.tokens[token]
+        return self._lines > 2 * len(self.tokens)
+
+    async def _compact(self) -> None:
+        known = dict(self.tokens)
+        live, inode, size = await asyncio.to_thread(self._rewrite, known)
+        # Keep anything that reached self.tokens while the log was being rewritten
+        live.update({token: exp for token, exp in self.tokens.items() if token not in known})
+        self.tokens = live
+        self._inode, self._offset, self._lines = inode, size, len(live)
+        self.counters["compactions"] += 1
+
+    async def load(self) -> None:
+        async with self._lock:
+            legacy = await self._refresh()
+            if legacy:
+                logger.info(f"Converting {self.path} to the token log format")
+            if legacy or self._needs_compaction():
+                await self._compact()
+        logger.info(f"Loaded {len(self.tokens)} issued tokens from {self.path}")
+
+    async def add(self, token: str) -> None:
+        expiry = self._expiry()
+        line = json.dumps({"t": token, "exp": round(expiry)}).encode("utf-8") + b"\n"
+        async with self._lock:
+            inode, start = await asyncio.to_thread(self._append, line)
+            self.tokens[token] = expiry
+            if inode == self._inode and start == self._offset:
+                self._offset = start + len(line)  # nothing in between from other workers
+            self._lines += 1
+            self.counters["issued"] += 1
+            if self._needs_compaction():
+                await self._compact()
+
+    async def contains(self, token: str) -> bool:
+        expiry = self.tokens.get(token)
+        if expiry is None:
+            async with self._lock:  # maybe issued by another worker
+                await self._refresh()
+            expiry = self.tokens.get(token)
+            if expiry is None:
+                self.counters["rejected"] += 1
+                return False
+        if expiry and expiry < time.time():
+            self.tokens.pop(token, None)
+            self.counters["expired"] += 1
+            return False
+        self.counters["accepted"] += 1
+        return True
+
+    def stats(self) -> dict:
+        return {"backend": "file", "tokens": len(self.tokens), "log_lines": self._lines, **self.counters}
+
+
+class RedisTokenStore(TokenStore):
+    """
+    One Redis key per token, expiring with the token.
+
+    Accepted tokens are remembered locally until their expiry, so an
+    authenticated request costs one Redis round trip per token and worker.
+    """
+
+    def __init__(self, url: str, ttl: int = 30 * DAY, key_prefix: str = "cfbd:mcp:token:"):
+        """Initialize the token store.
+
+        Args:
+            url: Redis URL
+            ttl: Seconds a token stays valid, 0 = never expires
+            key_prefix: Prefix of the Redis keys
+        """
+        super().__init__(ttl)
+        self.url = url
+        self.key_prefix = key_prefix
+        self.known: dict[str, float] = {}  # token -> expiry (0 = never), tokens seen in Redis
+        self.counters["errors"] = 0
+        self._redis: redis.Redis | None = None
+
+    def _client(self) -> redis.Redis:
+        if self._redis is None:
+            self._redis = redis.from_url(self.url, decode_responses=False)
+        return self._redis
+
+    async def add(self, token: str) -> None:
+        await self._client().set(f"{self.key_prefix}{token}", b"1", ex=self.ttl if self.ttl > 0 else None)
+        self.known[token] = self._expiry()
+        self.counters["issued"] += 1
+
+    async def contains(self, token: str) -> bool:
+        expiry = self.known.get(token)
+        if expiry is not None:
+            if not expiry or expiry > time.time():
+                self.counters["accepted"] += 1
+                return True
+            del self.known[token]
+            self.counters["expired"] += 1
+            return False
+        try:
+            remaining_ms = await self._client().pttl(f"{self.key_prefix}{token}")
+        except redis.RedisError as e:
+            logger.error(f"Token lookup failed: {e}")
+            self.counters["errors"] += 1
+            return False
+        if remaining_ms == -2:  # no such key
+            self.counters["rejected"] += 1
+            return False
+        self.known[token] = 0.0 if remaining_ms < 0 else time.time() + remaining_ms / 1000
+        self.counters["accepted"] += 1
+        return True
+
+    def stats(self) -> dict:
+        return {"backend": "redis", "known_locally": len(self.known), **self.counters}
+
+    async def close(self) -> None:
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
+
+
+class AuthCodeStore:
+    """
+    Pending authorization codes in memory: expire after `ttl` seconds, are
+    removed when redeemed, and the oldest are dropped beyond `max_codes`.
+    """
+
+    def __init__(self, ttl: int = 600, max_codes: int = 10000):
+        """Initialize the code store.
+
+        Args:
+            ttl: Seconds a code can be redeemed
+            max_codes: Maximum number of pending codes kept
+        """
+        self.ttl = ttl
+        self.max_codes = max_codes
+        self.codes: OrderedDict[str, tuple[float, dict]] = OrderedDict()  # oldest first
+        self.counters = {"issued": 0, "redeemed": 0, "unknown": 0, "expired": 0, "evicted": 0}
+
+    def _purge(self, now: float) -> None:
+        # Same ttl for every code, so insertion order is expiry order
+        while self.codes:
+            code, (expiry, _) = next(iter(self.codes.items()))
+            if expiry > now:
+                break
+            del self.codes[code]
+            self.counters["expired"] += 1
+
+    async def put(self, code: str, entry: dict) -> None:
+        """Record a new code and what it was issued for."""
+        now = time.time()
+        self._purge(now)
+        while len(self.codes) >= self.max_codes:
+            self.codes.popitem(last=False)
+            self.counters["evicted"] += 1
+        self.codes[code] = (now + self.ttl, entry)
+        self.counters["issued"] += 1
+
+    async def take(self, code: str) -> dict | None:
+        """Remove a code and return its entry, or None if unknown or expired."""
+        found = self.codes.pop(code, None)
+        if found is None:
+            self.counters["unknown"] += 1
+            return None
+        expiry, entry = found
+        if expiry <= time.time():
+            self.counters["expired"] += 1
+            return None
+        self.counters["redeemed"] += 1
+        return entry
+
+    def stats(self) -> dict:
+        return {"backend": "memory", "pending": len(self.codes), "ttl": self.ttl, "max_codes": self.max_codes,
+                **self.counters}
+
+    async def close(self) -> None:
+        pass
+
+
+class RedisAuthCodeStore(AuthCodeStore):
+    """
+    One Redis key per code with the code TTL, read and deleted in a single
+    GETDEL so a code is redeemed at most once across all workers. Redis
+    expiry bounds the number of pending codes.
+    """
+
+    def __init__(self, url: str, ttl: int = 600, key_prefix: str = "cfbd:mcp:code:"):
+        """Initialize the code store.
+
+        Args:
+            url: Redis URL
+            ttl: Seconds a code can be redeemed
+            key_prefix: Prefix of the Redis keys
+        """
+        super().__init__(ttl)
+        self.url = url
+        self.key_prefix = key_prefix
+        self._redis: redis.Redis | None = None
+
+    def _client(self) -> redis.Redis:
+        if self._redis is None:
+            self._redis = redis.from_url(self.url, decode_responses=False)
+        return self._redis
+
+    async def put(self, code: str, entry: dict) -> None:
+        await self._client().set(f"{self.key_prefix}{code}", json.dumps(entry).encode("utf-8"), ex=self.ttl)
+        self.counters["issued"] += 1
+
+    async def take(self, code: str) -> dict | None:
+        try:
+            value = await self._client().getdel(f"{self.key_prefix}{code}")
+        except redis.RedisError as e:
+            logger.error(f"Authorization code lookup failed: {e}")
+            return None
+        if value is None:
+            self.counters["unknown"] += 1
+            return None
+        self.counters["redeemed"] += 1
+        return json.loads(value)
+
+    def stats(self) -> dict:
+        return {"backend": "redis", "ttl": self.ttl, **self.counters}
+
+    async def close(self) -> None:
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
@@ -0,0 +1,168 @@
+"""
+Season-aware TTL policy for the CFBD URL cache.
+
+A TTL is chosen by the first rule that matches the endpoint, the request's
+year/week/gameId parameters and today's date. Completed seasons never change
+and are cached for a long time; the current week is cached briefly because
+scores, lines and stats move on game day.
+
+Extra rules can be loaded from a JSON file (CFBD_TTL_RULES); they are checked
+before the built-in ones. Each rule is an object such as:
+
+    {"name": "lines-live", "ttl": 60, "endpoints": ["/lines"], "week": "current"}
+
+Matchers (all optional; an omitted matcher matches anything):
+    endpoints: list of paths, e.g. ["/games", "/games/teams"]
+    season:    "completed" | "current" | "upcoming" | "none" (no year given)
+    week:      "past" | "current" | "future" | "none" (no week given)
+    game_id:   true/false, whether a gameId/game_id parameter is present
+"""
+
+import json
+import logging
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+logger = logging.getLogger(__name__)
+
+MINUTE = 60
+HOUR = 60 * MINUTE
+DAY = 24 * HOUR
+
+# Week 1 of a season is taken to start the last week of August, and the
+# season to be over once February begins (after the national championship).
+SEASON_START = (8, 24)  # (month, day)
+SEASON_END_MONTH = 2    # February of year + 1
+
+
+@dataclass
+class TtlRule:
+    """
+    One TTL rule. First match wins.
+    """
+
+    name: str
+    ttl: int
+    endpoints: tuple[str, ...] | None = None
+    season: str | None = None
+    week: str | None = None
+    game_id: bool | None = None
+
+    def matches(self, endpoint: str, season: str, week: str, has_game_id: bool) -> bool:
+        if self.endpoints is not None and endpoint not in self.endpoints:
+            return False
+        if self.season is not None and self.season != season:
+            return False
+        if self.week is not None and self.week != week:
+            return False
+        if self.game_id is not None and self.game_id != has_game_id:
+            return False
+        return True
+
+
+DEFAULT_RULES = [
+    TtlRule("completed-season", 365 * DAY, season="completed"),
+    TtlRule("coaches", 30 * DAY, endpoints=("/coaches",)),
+    TtlRule("reference", DAY, endpoints=("/teams", "/conferences")),
+    TtlRule("lines-current", 5 * MINUTE, endpoints=("/lines",), season="current"),
+    TtlRule("lines-by-game", 5 * MINUTE, endpoints=("/lines",), game_id=True),
+    TtlRule("game-by-id", 6 * HOUR, season="none", game_id=True),
+    TtlRule("current-week", 5 * MINUTE, season="current", week="current"),
+    TtlRule("past-week", DAY, season="current", week="past"),
+    TtlRule("future-week", 6 * HOUR, week="future"),
+    TtlRule("current-season", 30 * MINUTE, season="current"),
+    TtlRule("upcoming-season", DAY, season="upcoming"),
+    TtlRule("default", HOUR),
+]
+
+
+def current_season(now: datetime) -> int:
+    """The season year in play (or most recently played) on `now`."""
+    return now.year if now.month >= SEASON_END_MONTH else now.year - 1
+
+
+def current_week(season: int, now: datetime) -> int:
+    """Approximate regular-season week number for `now` (0 before the season starts)."""
+    start = datetime(season, *SEASON_START, tzinfo=timezone.utc)
+    if now < start:
+        return 0
+    return (now - start).days // 7 + 1
+
+
+def _as_int(value) -> int | None:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class TtlPolicy:
+    """
+    Evaluates TTL rules and keeps per-rule cache outcome counters.
+    """
+
+    def __init__(self, rules: list[TtlRule]):
+        self.rules = rules
+        self.outcomes: dict[str, dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    @classmethod
+    def from_file(cls, path: str | None) -> "TtlPolicy":
+        """Built-in rules, preceded by any rules from a JSON file."""
+        rules: list[TtlRule] = []
+        if path:
+            try:
+                with open(path, "r") as f:
+                    for raw in json.load(f):
+                        if raw.get("endpoints") is not None:
+                            raw["endpoints"] = tuple(raw["endpoints"])
+                        rules.append(TtlRule(**raw))
+            except Exception as e:
+                logger.error(f"Failed to load TTL rules from {path}: {e}")
+        return cls(rules + DEFAULT_RULES)
+
+    def classify(self, params: dict, now: datetime) -> tuple[str, str]:
+        """Return (season class, week class) for the request parameters."""
+        year = _as_int(params.get("year"))
+        if year is None:
+            return "none", "none"
+        season_now = current_season(now)
+        # current_season() already rolls over once a season ends in February
+        if year < season_now:
+            return "completed", "past"
+        season = "current" if year == season_now else "upcoming"
+
+        season_type = params.get("seasonType") or params.get("season_type")
+        if season_type == "postseason":
+            return season, ("current" if now.month in (12, 1) else "future")
+        week = _as_int(params.get("week"))
+        if week is None:
+            return season, "none"
+        week_now = current_week(year, now)
+        # The week just played still gets stat corrections for a few days
+        if week > week_now:
+            return season, "future"
+        if week >= week_now - 1:
+            return season, "current"
+        return season, "past"
+
+    def resolve(self, endpoint: str, params: dict, now: datetime | None = None) -> tuple[int, str]:
+        """Return (ttl seconds, rule name) for a request."""
+        now = now or datetime.now(timezone.utc)
+        season, week = self.classify(params, now)
+        has_game_id = any(params.get(k) not in (None, "") for k in ("gameId", "game_id", "id"))
+        for rule in self.rules:
+            if rule.matches(endpoint, season, week, has_game_id):
+                return rule.ttl, rule.name
+        return HOUR, "default"
+
+    def record(self, rule: str, outcome: str) -> None:
+        """Count a cache outcome ("hit", "stale", "miss") against the rule that set the TTL."""
+        self.outcomes[rule][outcome] += 1
+
+    def stats(self) -> dict:
+        out = {}
+        for rule, counts in self.outcomes.items():
+            total = sum(counts.values())
+            out[rule] = dict(counts, hit_rate=round(counts.get("hit", 0) / total, 3) if total else 0.0)
+        return out
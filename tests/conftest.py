@@ -0,0 +1,4 @@
+import os
+
+# Importing the package loads server.py, which refuses to start without an API key
+os.environ.setdefault("CFB_API_KEY", "test-key")
@@ -0,0 +1,102 @@
+import pytest
+
+from cfbd_mcp_server.cfbd_schema import GamesResponse, PlaysResponse
+from cfbd_mcp_server.query import MAX_EXPRESSION_LENGTH, MAX_NESTING, QueryError, compile_query
+
+PLAYS = [
+    {"id": 1, "offense": "Alabama", "down": 3, "distance": 5, "yards_gained": 7, "clock": {"minutes": 3}},
+    {"id": 2, "offense": "Alabama", "down": 1, "distance": 10, "yards_gained": 2, "clock": {"minutes": 9}},
+    {"id": 3, "offense": "Auburn", "down": 3, "distance": 2, "yards_gained": 1, "clock": {"minutes": 1}},
+    {"id": 4, "offense": "Auburn", "down": 3, "distance": 8, "yards_gained": 12, "clock": {"minutes": 9}},
+]
+
+
+def run(options, data=PLAYS, response_type=PlaysResponse):
+    return compile_query(options, response_type).apply(data)
+
+
+def test_no_query_options():
+    assert compile_query({"fields": ["id"]}, PlaysResponse) is None
+
+
+def test_filter_comparisons_and_membership():
+    rows = run({"filter": 'offense == "Alabama" and down == 3'})
+    assert [r["id"] for r in rows] == [1]
+    rows = run({"filter": "down in [1, 2] or yards_gained >= distance"})
+    assert [r["id"] for r in rows] == [1, 2, 4]
+    rows = run({"filter": 'not (offense == "Alabama")'})
+    assert [r["id"] for r in rows] == [3, 4]
+
+
+def test_filter_on_nested_path():
+    assert [r["id"] for r in run({"filter": "clock.minutes > 5"})] == [2, 4]
+
+
+def test_string_escapes():
+    data = [{"home_team": "Hawai'i"}, {"home_team": 'Say "hi"'}, {"home_team": "back\\slash"}]
+    assert run({"filter": r"home_team == 'Hawai\'i'"}, data, GamesResponse) == [data[0]]
+    assert run({"filter": r'home_team == "Say \"hi\""'}, data, GamesResponse) == [data[1]]
+    assert run({"filter": r'home_team == "back\\slash"'}, data, GamesResponse) == [data[2]]
+
+
+def test_other_backslashes_are_kept():
+    data = [{"home_team": "a\\nb"}]
+    assert run({"filter": r'home_team == "a\nb"'}, data, GamesResponse) == data
+
+
+def test_non_ascii_literal():
+    data = [{"home_team": "San José State"}, {"home_team": "San Jose State"}]
+    assert run({"filter": 'home_team == "San José State"'}, data, GamesResponse) == [data[0]]
+
+
+def test_unknown_field_rejected():
+    with pytest.raises(ValueError):
+        compile_query({"filter": "not_a_field == 1"}, PlaysResponse)
+
+
+def test_nesting_within_limit():
+    depth = MAX_NESTING
+    rows = run({"filter": "(" * depth + "down == 3" + ")" * depth})
+    assert [r["id"] for r in rows] == [1, 3, 4]
+
+
+@pytest.mark.parametrize("expression", [
+    "(" * (MAX_NESTING + 1) + "down == 3" + ")" * (MAX_NESTING + 1),
+    "not " * (MAX_NESTING + 1) + "down == 3",
+    "(" * 3000 + "down" + ")" * 3000,
+    " or ".join(["down == 3"] * (MAX_EXPRESSION_LENGTH // 10)),
+])
+def test_deep_or_long_expressions_raise_query_error(expression):
+    with pytest.raises(QueryError):
+        compile_query({"filter": expression}, PlaysResponse)
+
+
+def test_group_by_aggregate():
+    rows = run({"group_by": ["offense"], "aggregate": ["count", "sum:yards_gained", "rate:down == 3"],
+                "sort": ["offense"]})
+    assert rows == [
+        {"offense": "Alabama", "count": 2, "sum_yards_gained": 9, "rate(down == 3)": 0.5},
+        {"offense": "Auburn", "count": 2, "sum_yards_gained": 13, "rate(down == 3)": 1.0},
+    ]
+
+
+def test_sort_by_dotted_group_by_field():
+    rows = run({"group_by": ["clock.minutes"], "sort": ["-clock.minutes"]})
+    assert [r["clock.minutes"] for r in rows] == [9, 3, 1]
+    rows = run({"group_by": ["clock.minutes"], "sort": ["clock.minutes"]})
+    assert [r["clock.minutes"] for r in rows] == [1, 3, 9]
+
+
+def test_sort_records_by_dotted_path_and_limit():
+    rows = run({"sort": ["-clock.minutes", "id"], "limit": 3})
+    assert [r["id"] for r in rows] == [2, 4, 1]
+
+
+def test_sort_on_unknown_aggregate_column_rejected():
+    with pytest.raises(QueryError):
+        compile_query({"group_by": ["offense"], "sort": ["down"]}, PlaysResponse)
+
+
+def test_limit_bounds():
+    with pytest.raises(QueryError):
+        compile_query({"limit": 0}, PlaysResponse)
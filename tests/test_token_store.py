@@ -0,0 +1,149 @@
+import asyncio
+import json
+
+import pytest
+
+from cfbd_mcp_server.token_store import AuthCodeStore, FileTokenStore, TokenStore
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def log_tokens(path) -> list[str]:
+    return [json.loads(line)["t"] for line in path.read_text().splitlines()]
+
+
+def test_token_store_is_abstract():
+    with pytest.raises(TypeError):
+        TokenStore()
+
+
+def test_add_contains_and_persist(tmp_path):
+    path = tmp_path / "tokens.log"
+
+    async def scenario():
+        store = FileTokenStore(str(path))
+        await store.load()
+        await store.add("a")
+        assert await store.contains("a")
+        assert not await store.contains("b")
+
+        reloaded = FileTokenStore(str(path))
+        await reloaded.load()
+        assert await reloaded.contains("a")
+
+    run(scenario())
+    assert log_tokens(path) == ["a"]
+
+
+def test_legacy_json_list_is_converted(tmp_path):
+    path = tmp_path / "tokens.json"
+    path.write_text(json.dumps(["old1", "old2"]))
+
+    async def scenario():
+        store = FileTokenStore(str(path))
+        await store.load()
+        assert await store.contains("old1") and await store.contains("old2")
+
+    run(scenario())
+    assert sorted(log_tokens(path)) == ["old1", "old2"]
+
+
+def test_tokens_issued_by_another_worker_are_seen(tmp_path):
+    path = tmp_path / "tokens.log"
+
+    async def scenario():
+        first, second = FileTokenStore(str(path)), FileTokenStore(str(path))
+        await first.load()
+        await second.load()
+        await first.add("from-first")
+        assert await second.contains("from-first")
+
+    run(scenario())
+
+
+def test_expired_tokens_are_rejected_and_compacted(tmp_path):
+    path = tmp_path / "tokens.log"
+
+    async def scenario():
+        store = FileTokenStore(str(path), ttl=1)
+        store.COMPACT_MIN_LINES = 10
+        await store.load()
+        for i in range(20):
+            await store.add(f"old{i}")
+        await asyncio.sleep(2.1)
+        assert not await store.contains("old0")
+        store.ttl = 3600
+        for i in range(5):
+            await store.add(f"new{i}")
+        assert store.counters["compactions"] >= 1
+        assert all(token.startswith("new") for token in store.tokens)
+        return store
+
+    store = run(scenario())
+    assert sorted(log_tokens(path)) == [f"new{i}" for i in range(5)]
+    assert store.stats()["log_lines"] == 5
+
+
+def test_expired_tokens_dropped_on_load(tmp_path):
+    path = tmp_path / "tokens.log"
+    path.write_text(json.dumps({"t": "gone", "exp": 1}) + "\n" + json.dumps({"t": "kept", "exp": 0}) + "\n")
+
+    async def scenario():
+        store = FileTokenStore(str(path))
+        await store.load()
+        return store
+
+    store = run(scenario())
+    assert store.tokens == {"kept": 0.0}
+
+
+def test_token_added_during_compaction_is_kept(tmp_path):
+    path = tmp_path / "tokens.log"
+
+    async def scenario():
+        store = FileTokenStore(str(path))
+        await store.load()
+        await store.add("a")
+        # Start a compaction and issue a token while the rewrite runs in its thread
+        compaction = asyncio.create_task(store._compact())
+        await asyncio.sleep(0)
+        await asyncio.gather(compaction, store.add("b"))
+        assert await store.contains("a")
+        assert await store.contains("b")
+
+        reloaded = FileTokenStore(str(path))
+        await reloaded.load()
+        assert await reloaded.contains("b")
+
+    run(scenario())
+
+
+def test_concurrent_adds(tmp_path):
+    path = tmp_path / "tokens.log"
+
+    async def scenario():
+        store = FileTokenStore(str(path))
+        store.COMPACT_MIN_LINES = 5
+        await store.load()
+        await asyncio.gather(*(store.add(f"t{i}") for i in range(50)))
+        for i in range(50):
+            assert await store.contains(f"t{i}")
+
+    run(scenario())
+    assert sorted(set(log_tokens(path))) == sorted(f"t{i}" for i in range(50))
+
+
+def test_auth_codes_are_single_use_and_capped():
+    async def scenario():
+        codes = AuthCodeStore(ttl=60, max_codes=2)
+        for code in ("c1", "c2", "c3"):
+            await codes.put(code, {"code": code})
+        assert await codes.take("c1") is None  # evicted
+        assert await codes.take("c3") == {"code": "c3"}
+        assert await codes.take("c3") is None  # already redeemed
+        return codes
+
+    codes = run(scenario())
+    assert codes.stats()["evicted"] == 1